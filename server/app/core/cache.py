@@ -1,11 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from typing import Any
 
+import orjson
 import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
 
 from .config import get_settings
+from .serialization import dump_json
+
+logger = logging.getLogger(__name__)
 
 
 class CacheClient:
@@ -16,30 +22,65 @@ class CacheClient:
     async def create(cls) -> 'CacheClient':
         settings = get_settings()
         try:
-            client = redis.from_url(settings.redis_url, decode_responses=True)
+            pool = redis.BlockingConnectionPool.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_pool_size,
+                timeout=5,
+                decode_responses=True
+            )
+            client = redis.Redis(connection_pool=pool)
             await client.ping()
-            print(f"Successfully connected to Redis at {settings.redis_url}")
+            logger.info('Connected to Redis at %s', settings.redis_url)
             return cls(client)
         except Exception as e:
-            print(f"Failed to connect to Redis: {e}")
+            logger.error('Failed to connect to Redis: %s', e)
             raise
 
+    @property
+    def raw(self) -> redis.Redis:
+        # The one Redis instance for the process; build no others, as each
+        # construction re-pays redis-py's client setup cost.
+        return self._client
+
     async def close(self) -> None:
-        await self._client.close()
+        await self._client.aclose()
+        await self._client.connection_pool.disconnect()
 
     async def set_json(self, key: str, value: Any, ttl: int | None) -> None:
-        if ttl:
-            await self._client.set(key, value, ex=ttl)
-        else:
-            await self._client.set(key, value)
+        await self._client.set(key, dump_json(value), ex=ttl or None)
 
     async def get_json(self, key: str) -> Any:
+        raw = await self._client.get(key)
+        return orjson.loads(raw) if raw else None
+
+    async def get_raw(self, key: str) -> str | None:
+        # For callers that validate the JSON themselves, e.g. pydantic's
+        # model_validate_json, so it is parsed only once.
         return await self._client.get(key)
 
+    async def mget_json(self, keys: list[str]) -> list[Any]:
+        if not keys:
+            return []
+        return [orjson.loads(raw) if raw else None for raw in await self._client.mget(keys)]
+
+    async def zrevrange(self, key: str, start: int, end: int) -> list[str]:
+        return await self._client.zrevrange(key, start, end)
+
+    async def hmget(self, key: str, fields: list[str]) -> list[str | None]:
+        return await self._client.hmget(key, fields)
+
+    async def delete(self, *keys: str) -> None:
+        await self._client.delete(*keys)
+
+    def pipeline(self) -> Pipeline:
+        return self._client.pipeline(transaction=False)
+
     async def set_hash(self, key: str, mapping: dict[str, Any], ttl: int | None = None) -> None:
-        await self._client.hset(key, mapping=mapping)
-        if ttl:
-            await self._client.expire(key, ttl)
+        async with self.pipeline() as pipe:
+            pipe.hset(key, mapping=mapping)
+            if ttl:
+                pipe.expire(key, ttl)
+            await pipe.execute()
 
     async def get_hash(self, key: str) -> dict[str, str]:
         return await self._client.hgetall(key)
@@ -51,7 +92,17 @@ cache_lock = asyncio.Lock()
 
 async def get_cache() -> CacheClient:
     global cache_client
+    if cache_client is not None:
+        return cache_client
     async with cache_lock:
         if cache_client is None:
             cache_client = await CacheClient.create()
     return cache_client
+
+
+async def close_cache() -> None:
+    global cache_client
+    async with cache_lock:
+        if cache_client is not None:
+            await cache_client.close()
+            cache_client = None
@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     openai_api_key: str | None = None
     langgraph_api_key: str | None = None
     redis_url: str = "redis://localhost:6379/0"
+    redis_pool_size: int = 64
     quick_cache_ttl: int = 60 * 30
     deep_cache_ttl: int = 60 * 60 * 6
     vector_store_path: str = "./data/vector"
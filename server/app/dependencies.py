@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from .services.cache import ExplainCache
+from .services.history import HistoryStore
+from .services.models import ModelStore
+from .services.profiles import ProfileStore
+from .services.settings import SettingsStore
+
+_explain_cache: ExplainCache | None = None
+_history_store: HistoryStore | None = None
+_settings_store: SettingsStore | None = None
+_profile_store: ProfileStore | None = None
+_model_store: ModelStore | None = None
+
+
+async def get_explain_cache() -> ExplainCache:
+    global _explain_cache
+    if _explain_cache is None:
+        _explain_cache = await ExplainCache.create()
+    return _explain_cache
+
+
+async def get_history_store() -> HistoryStore:
+    global _history_store
+    if _history_store is None:
+        _history_store = await HistoryStore.create()
+    return _history_store
+
+
+async def get_settings_store() -> SettingsStore:
+    global _settings_store
+    if _settings_store is None:
+        _settings_store = await SettingsStore.create()
+    return _settings_store
+
+
+async def get_profile_store() -> ProfileStore:
+    global _profile_store
+    if _profile_store is None:
+        _profile_store = await ProfileStore.create()
+    return _profile_store
+
+
+async def get_model_store() -> ModelStore:
+    global _model_store
+    if _model_store is None:
+        _model_store = await ModelStore.create()
+    return _model_store
+
+
+async def init_stores() -> None:
+    await get_explain_cache()
+    history_store = await get_history_store()
+    await history_store.migrate_legacy()
+    await get_settings_store()
+    await get_profile_store()
+    await get_model_store()
@@ -1,14 +1,21 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
-from .core.cache import get_cache
+from .core.cache import close_cache
 from .core.config import get_settings
+from .dependencies import init_stores
 from .routes import api_v1, collections, explain, models, profiles
+from .services.online import close_online_client
+from .services.openai_client import close_clients
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
     app = FastAPI(title=settings.app_name)
+    app.state.pending_tasks = set()
 
     # Configure CORS
     app.add_middleware(
@@ -18,10 +25,19 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Starlette leaves text/event-stream uncompressed, so SSE frames still flush immediately.
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=4)
 
     @app.on_event('startup')
     async def startup_event():
-        await get_cache()
+        await init_stores()
+
+    @app.on_event('shutdown')
+    async def shutdown_event():
+        await asyncio.gather(*app.state.pending_tasks, return_exceptions=True)
+        await close_clients()
+        await close_online_client()
+        await close_cache()
 
     @app.get('/health')
     async def health():
@@ -1,21 +1,39 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 
 from ..schemas.collection import CollectionIngestRequest
 from ..services.rag import RagRetriever
 
 router = APIRouter(prefix='/collections', tags=['collections'])
 
+INGEST_BATCH_SIZE = 128
+
 
 @router.post('')
 async def ingest_collection(request: CollectionIngestRequest):
     retriever = RagRetriever(collection_name=request.name)
     try:
-        collection = retriever.ensure_collection()
+        collection = await run_in_threadpool(retriever.ensure_collection)
     except Exception as error:
         raise HTTPException(status_code=500, detail=str(error)) from error
 
     documents = [doc.text for doc in request.documents]
     metadatas = [doc.metadata for doc in request.documents]
     ids = [doc.id for doc in request.documents]
-    collection.add(documents=documents, metadatas=metadatas, ids=ids)
+    # Batches keep embedding memory bounded and the event loop free; earlier
+    # batches stay ingested if a later one fails.
+    for start in range(0, len(documents), INGEST_BATCH_SIZE):
+        end = start + INGEST_BATCH_SIZE
+        try:
+            await run_in_threadpool(
+                collection.add,
+                documents=documents[start:end],
+                metadatas=metadatas[start:end],
+                ids=ids[start:end]
+            )
+        except Exception as error:
+            raise HTTPException(
+                status_code=500,
+                detail=f'{error} (ingested {start} of {len(documents)} documents)'
+            ) from error
     return {'ok': True, 'count': len(documents)}
@@ -1,87 +1,156 @@
 from __future__ import annotations
 
-import json
-from typing import AsyncGenerator
+import asyncio
+import logging
+from typing import Any, AsyncGenerator, Coroutine
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter, Depends, FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 
 from ..core.config import get_settings
+from ..core.serialization import dump_json
+from ..dependencies import get_explain_cache
 from ..schemas.explain import (
+    DeepBackgroundEvent,
+    DeepCrossCultureEvent,
     DeepExplainResponse,
+    DeepSourcesEvent,
+    ExplainJobStatus,
     ExplainRequest,
     QuickExplainResponse,
     SourceReference
 )
 from ..services.cache import ExplainCache
-from ..services.merge import merge_sources, rank_sources
-from ..services.online import fetch_urban_dictionary, fetch_wikipedia_summary
+from ..services.merge import merge_and_rank
+from ..services.online import fetch_online_sources
 from ..services.openai_client import OpenAIClient
 from ..services.rag import RagRetriever, documents_to_sources
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix='/explain', tags=['explain'])
 
+ENABLE_ONLINE_SOURCES = get_settings().enable_online_sources
+
+
+def _write_behind(app: FastAPI, write: Coroutine[Any, Any, None]) -> None:
+    # Tracked on app.state so the task is not garbage-collected mid-write and
+    # shutdown can wait for outstanding cache writes.
+    pending: set[asyncio.Task] = app.state.pending_tasks
+    task = asyncio.create_task(write)
+    pending.add(task)
+    task.add_done_callback(pending.discard)
+
 
 def _extract_openai_credentials(req: Request) -> tuple[str | None, str | None]:
-    key = req.headers.get('x-openai-key')
+    # Starlette headers are case-insensitive, so one lookup per header suffices.
+    headers = req.headers
+    key = (headers.get('x-openai-key') or '').strip()
     if not key:
-        key = req.headers.get('X-OpenAI-Key')
-    if key:
-        key = key.strip()
-    auth_header = req.headers.get('authorization') or req.headers.get('Authorization')
-    if (not key) and auth_header and auth_header.lower().startswith('bearer '):
-        key = auth_header[7:].strip()
-    base_url = req.headers.get('x-openai-base') or req.headers.get('X-OpenAI-Base')
-    if base_url:
-        base_url = base_url.strip()
+        auth_header = headers.get('authorization') or ''
+        if auth_header[:7].lower() == 'bearer ':
+            key = auth_header[7:].strip()
+    base_url = (headers.get('x-openai-base') or '').strip()
     return key or None, base_url or None
 
 
 @router.post('/quick', response_model=QuickExplainResponse)
-async def post_quick_explain(request: ExplainRequest, http_request: Request) -> QuickExplainResponse:
-    cache = await ExplainCache.create()
+async def post_quick_explain(
+    request: ExplainRequest,
+    http_request: Request,
+    cache: ExplainCache = Depends(get_explain_cache)
+) -> QuickExplainResponse:
     cached = await cache.get_quick(request.subtitleText, request.profileId)
     if cached:
         return QuickExplainResponse.model_validate(cached)
 
     api_key, base_url = _extract_openai_credentials(http_request)
     client = await OpenAIClient.create(api_key=api_key, base_url=base_url)
-    try:
-        response = await client.quick_explain(request)
-    finally:
-        await client.close()
-    await cache.set_quick(request.subtitleText, request.profileId, response.model_dump())
+    response = await client.quick_explain(request)
+    _write_behind(http_request.app, cache.set_quick(request.subtitleText, request.profileId, response))
     return response
 
 
-def _sse(event: str, data: dict) -> bytes:
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode('utf-8')
+@router.post('/quick/batch', response_model=list[ExplainJobStatus])
+async def post_quick_explain_batch(
+    requests: list[ExplainRequest],
+    http_request: Request,
+    cache: ExplainCache = Depends(get_explain_cache)
+) -> list[ExplainJobStatus]:
+    cached = await asyncio.gather(*(
+        cache.get_quick(request.subtitleText, request.profileId) for request in requests
+    ))
+    misses = [request for request, hit in zip(requests, cached) if not hit]
+    results: list[QuickExplainResponse | BaseException] = []
+    if misses:
+        api_key, base_url = _extract_openai_credentials(http_request)
+        client = await OpenAIClient.create(api_key=api_key, base_url=base_url)
+        results = await client.quick_explain_batch(misses)
+    fresh = iter(results)
+
+    statuses = []
+    for request, hit in zip(requests, cached):
+        if hit:
+            statuses.append(ExplainJobStatus(
+                requestId=request.requestId,
+                status='completed',
+                result=QuickExplainResponse.model_validate({**hit, 'requestId': request.requestId})
+            ))
+            continue
+        result = next(fresh)
+        if isinstance(result, BaseException):
+            statuses.append(ExplainJobStatus(requestId=request.requestId, status='failed', error=str(result)))
+            continue
+        _write_behind(http_request.app, cache.set_quick(request.subtitleText, request.profileId, result))
+        statuses.append(ExplainJobStatus(requestId=request.requestId, status='completed', result=result))
+    return statuses
+
+
+def _sse(event: str, data: Any) -> bytes:
+    return b'event: ' + event.encode('utf-8') + b'\ndata: ' + dump_json(data) + b'\n\n'
+
+
+def _background_event(response: DeepExplainResponse) -> DeepBackgroundEvent:
+    return DeepBackgroundEvent(
+        requestId=response.requestId,
+        background=response.background,
+        reasoningNotes=response.reasoningNotes
+    )
 
 
-@router.post('/deep')
-async def post_deep_explain(request: ExplainRequest, http_request: Request) -> StreamingResponse:
-    cache = await ExplainCache.create()
-    cached = await cache.get_deep(request.subtitleText, request.profileId)
-    if cached:
-        cached_response = DeepExplainResponse.model_validate(cached)
+def _cross_culture_event(response: DeepExplainResponse) -> DeepCrossCultureEvent:
+    return DeepCrossCultureEvent(
+        requestId=response.requestId,
+        crossCulture=response.crossCulture,
+        confidence=response.confidence,
+        reasoningNotes=response.reasoningNotes
+    )
 
-        async def replay_cached() -> AsyncGenerator[bytes, None]:
-            yield _sse('background', {
-                'requestId': cached_response.requestId,
-                'background': cached_response.background.model_dump(),
-                'reasoningNotes': cached_response.reasoningNotes
-            })
-            yield _sse('crossCulture', {
-                'requestId': cached_response.requestId,
-                'crossCulture': [item.model_dump() for item in cached_response.crossCulture],
-                'confidence': cached_response.confidence.model_dump(),
-                'reasoningNotes': cached_response.reasoningNotes
-            })
-            yield _sse('sources', {
-                'requestId': cached_response.requestId,
-                'sources': [source.model_dump() for source in cached_response.sources]
-            })
-            yield _sse('complete', cached_response.model_dump())
+
+def _replay_frames(response: DeepExplainResponse) -> list[bytes]:
+    return [
+        _sse('background', _background_event(response)),
+        _sse('crossCulture', _cross_culture_event(response)),
+        _sse('sources', DeepSourcesEvent(requestId=response.requestId, sources=response.sources)),
+        _sse('complete', response)
+    ]
+
+
+@router.post('/deep')
+async def post_deep_explain(
+    request: ExplainRequest,
+    http_request: Request,
+    cache: ExplainCache = Depends(get_explain_cache)
+) -> StreamingResponse:
+    replay, cached = await cache.get_deep_replay(request.subtitleText, request.profileId)
+    if replay or cached:
+        async def replay_cached() -> AsyncGenerator[bytes | str, None]:
+            if replay:
+                yield replay
+                return
+            for frame in _replay_frames(DeepExplainResponse.model_validate(cached)):
+                yield frame
 
         return StreamingResponse(
             replay_cached(),
@@ -91,34 +160,28 @@ async def post_deep_explain(request: ExplainRequest, http_request: Request) -> S
 
     api_key, base_url = _extract_openai_credentials(http_request)
 
+    retriever = RagRetriever()
+    lookups = [run_in_threadpool(retriever.retrieve, request.subtitleText, top_k=5)]
+    if ENABLE_ONLINE_SOURCES:
+        lookups.append(fetch_online_sources(request.subtitleText))
+    # Chroma runs in the threadpool so RAG and the online lookups overlap on the network.
+    rag_result, *online_results = await asyncio.gather(*lookups, return_exceptions=True)
+
     knowledge_sections = []
     rag_sources = []
-    retriever = RagRetriever()
-    try:
-        docs = retriever.retrieve(request.subtitleText, top_k=5)
-        for idx, doc in enumerate(docs, start=1):
-            knowledge_sections.append(f'[{idx}] {doc.text}')
-        rag_sources = documents_to_sources(docs)
-    except Exception:
+    if isinstance(rag_result, BaseException):
+        logger.warning('RAG lookup failed: %s', rag_result)
         knowledge_sections.append('No RAG documents available.')
+    else:
+        for idx, doc in enumerate(rag_result, start=1):
+            knowledge_sections.append(f'[{idx}] {doc.text}')
+        rag_sources = documents_to_sources(rag_result)
 
-    online_sources = []
-    settings = get_settings()
-    if settings.enable_online_sources:
-        try:
-            urban_sources = await fetch_urban_dictionary(request.subtitleText)
-            online_sources.extend(urban_sources)
-            print(f'[LinguaLens] Urban Dictionary 返回 {len(urban_sources)} 个来源')
-        except Exception as exc:
-            print(f'[LinguaLens] Urban Dictionary 调用失败: {exc}')
-        try:
-            wiki_sources = await fetch_wikipedia_summary(request.subtitleText)
-            online_sources.extend(wiki_sources)
-            print(f'[LinguaLens] Wikipedia 返回 {len(wiki_sources)} 个来源')
-        except Exception as exc:
-            print(f'[LinguaLens] Wikipedia 调用失败: {exc}')
-
-    merged_sources = rank_sources(merge_sources(rag_sources, online_sources))
+    online_sources = online_results[0] if online_results else []
+    if isinstance(online_sources, BaseException):
+        logger.warning('Online source lookup failed: %s', online_sources)
+        online_sources = []
+    merged_sources = merge_and_rank(rag_sources, online_sources)
     if not merged_sources:
         merged_sources.append(
             SourceReference(
@@ -134,35 +197,32 @@ async def post_deep_explain(request: ExplainRequest, http_request: Request) -> S
     async def stream_deep_explain() -> AsyncGenerator[bytes, None]:
         try:
             if merged_sources:
-                yield _sse('sources', {
-                    'requestId': request.requestId,
-                    'sources': [source.model_dump() for source in merged_sources]
-                })
+                yield _sse('sources', DeepSourcesEvent(
+                    requestId=request.requestId,
+                    sources=merged_sources
+                ))
 
             client = await OpenAIClient.create(api_key=api_key, base_url=base_url)
-            try:
-                response = await client.deep_explain(request, knowledge_base, merged_sources)
-            finally:
-                await client.close()
-
-            await cache.set_deep(
+            response = None
+            # The upstream call streams so a wrong-language answer is cut off
+            # early; the extension renders only the structured frames, so the
+            # raw text deltas stay server-side.
+            async for chunk in client.deep_explain_stream(request, knowledge_base, merged_sources):
+                if chunk.response is not None:
+                    response = chunk.response
+            if response is None:
+                raise RuntimeError('Deep explain stream ended without a response.')
+
+            yield _sse('background', _background_event(response))
+            yield _sse('crossCulture', _cross_culture_event(response))
+            yield _sse('complete', response)
+
+            _write_behind(http_request.app, cache.set_deep(
                 request.subtitleText,
                 request.profileId,
-                response.model_dump()
-            )
-
-            yield _sse('background', {
-                'requestId': response.requestId,
-                'background': response.background.model_dump(),
-                'reasoningNotes': response.reasoningNotes
-            })
-            yield _sse('crossCulture', {
-                'requestId': response.requestId,
-                'crossCulture': [item.model_dump() for item in response.crossCulture],
-                'confidence': response.confidence.model_dump(),
-                'reasoningNotes': response.reasoningNotes
-            })
-            yield _sse('complete', response.model_dump())
+                response,
+                replay=b''.join(_replay_frames(response))
+            ))
         except Exception as exc:  # pragma: no cover - surface error to client
             yield _sse('error', {
                 'requestId': request.requestId,
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from ..dependencies import get_model_store
 from ..schemas.model import ModelCollection, ModelConfig, SetDefaultModelPayload
 from ..services.models import ModelStore
 
@@ -9,22 +10,19 @@ router = APIRouter(prefix='/models', tags=['models'])
 
 
 @router.get('', response_model=ModelCollection)
-async def list_models() -> ModelCollection:
-    store = await ModelStore.create()
+async def list_models(store: ModelStore = Depends(get_model_store)) -> ModelCollection:
     models = await store.list_models()
     return ModelCollection(models=models)
 
 
 @router.post('', response_model=ModelConfig)
-async def upsert_model(payload: ModelConfig) -> ModelConfig:
-    store = await ModelStore.create()
+async def upsert_model(payload: ModelConfig, store: ModelStore = Depends(get_model_store)) -> ModelConfig:
     saved = await store.save_model(payload)
     return saved
 
 
 @router.delete('/{model_id}')
-async def delete_model(model_id: str):
-    store = await ModelStore.create()
+async def delete_model(model_id: str, store: ModelStore = Depends(get_model_store)):
     existing = await store.get_model(model_id)
     if existing is None:
         raise HTTPException(status_code=404, detail='Model config not found')
@@ -33,8 +31,10 @@ async def delete_model(model_id: str):
 
 
 @router.post('/default', response_model=ModelConfig | None)
-async def set_default_model(payload: SetDefaultModelPayload) -> ModelConfig | None:
-    store = await ModelStore.create()
+async def set_default_model(
+    payload: SetDefaultModelPayload,
+    store: ModelStore = Depends(get_model_store)
+) -> ModelConfig | None:
     if payload.modelId:
         existing = await store.get_model(payload.modelId)
         if existing is None:
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
+from ..dependencies import get_profile_store
 from ..schemas.profile import ProfileCollection, ProfileTemplate
 from ..services.profiles import ProfileStore
 
@@ -7,14 +8,15 @@ router = APIRouter(prefix='/profiles', tags=['profiles'])
 
 
 @router.get('', response_model=ProfileCollection)
-async def list_profiles() -> ProfileCollection:
-    store = await ProfileStore.create()
+async def list_profiles(store: ProfileStore = Depends(get_profile_store)) -> ProfileCollection:
     profiles = await store.list_profiles()
     return ProfileCollection(profiles=profiles)
 
 @router.post('', response_model=ProfileTemplate)
-async def create_profile(profile: ProfileTemplate) -> ProfileTemplate:
-    store = await ProfileStore.create()
+async def create_profile(
+    profile: ProfileTemplate,
+    store: ProfileStore = Depends(get_profile_store)
+) -> ProfileTemplate:
     try:
         saved = await store.upsert(profile)
     except ValueError as error:
@@ -22,8 +24,10 @@ async def create_profile(profile: ProfileTemplate) -> ProfileTemplate:
     return saved
 
 @router.put('', response_model=ProfileTemplate)
-async def upsert_profile(profile: ProfileTemplate) -> ProfileTemplate:
-    store = await ProfileStore.create()
+async def upsert_profile(
+    profile: ProfileTemplate,
+    store: ProfileStore = Depends(get_profile_store)
+) -> ProfileTemplate:
     try:
         saved = await store.upsert(profile)
     except ValueError as error:
@@ -32,10 +36,8 @@ async def upsert_profile(profile: ProfileTemplate) -> ProfileTemplate:
 
 
 @router.delete('/{profile_id}')
-async def delete_profile(profile_id: str):
-    store = await ProfileStore.create()
-    profiles = await store.list_profiles()
-    if not any(profile.id == profile_id for profile in profiles):
+async def delete_profile(profile_id: str, store: ProfileStore = Depends(get_profile_store)):
+    if not await store.exists(profile_id):
         raise HTTPException(status_code=404, detail='Profile not found')
     await store.delete(profile_id)
     return {'ok': True}
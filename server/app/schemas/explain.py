@@ -73,6 +73,24 @@ class DeepExplainResponse(BaseModel):
     language: str | None = None
 
 
+class DeepBackgroundEvent(BaseModel):
+    requestId: str
+    background: DeepBackground
+    reasoningNotes: str | None = None
+
+
+class DeepCrossCultureEvent(BaseModel):
+    requestId: str
+    crossCulture: Sequence[CrossCultureInsight]
+    confidence: DeepConfidence
+    reasoningNotes: str | None = None
+
+
+class DeepSourcesEvent(BaseModel):
+    requestId: str
+    sources: Sequence[SourceReference]
+
+
 class ExplainJobStatus(BaseModel):
     requestId: str
     status: Literal['queued', 'processing', 'completed', 'failed']
@@ -1,41 +1,93 @@
 from __future__ import annotations
 
-import json
+import re
+import string
 from typing import Any
 
+import orjson
+import xxhash
+
 from ..core.cache import CacheClient, get_cache
 from ..core.config import get_settings
+from ..core.serialization import dump_json
+
+# Bump when the SSE frame layout changes so stale pre-built replays are ignored.
+DEEP_REPLAY_VERSION = 'v1'
+
+# Apostrophes are kept so contractions such as "we'll" do not collide with "well".
+_PUNCT_TABLE = str.maketrans('', '', string.punctuation.replace("'", ''))
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_subtitle(text: str) -> str:
+    """Canonical form used for cache keys: casing, punctuation and spacing are ignored."""
+    normalized = _WHITESPACE_RE.sub(' ', text.lower().translate(_PUNCT_TABLE)).strip()
+    # Punctuation-only lines ("...", "?!") would all collapse to one empty key.
+    return normalized or text.strip()
 
 
 class ExplainCache:
     def __init__(self, client: CacheClient):
         self._client = client
+        settings = get_settings()
+        self._quick_ttl = settings.quick_cache_ttl
+        self._deep_ttl = settings.deep_cache_ttl
 
     @classmethod
     async def create(cls) -> 'ExplainCache':
         client = await get_cache()
         return cls(client)
 
+    def _key_suffix(self, text: str, profile_id: str | None) -> str:
+        # A fixed-size digest keeps keys small however long the subtitle is, and
+        # hashing the canonical form lets "Break a leg!" reuse "break a leg".
+        digest = xxhash.xxh3_64_hexdigest(normalize_subtitle(text).encode('utf-8'))
+        return f'{profile_id or "default"}::{digest}'
+
     def _quick_key(self, text: str, profile_id: str | None) -> str:
-        return f'quick::{profile_id or "default"}::{ text.strip().lower() }'
+        return f'quick::{self._key_suffix(text, profile_id)}'
 
     def _deep_key(self, text: str, profile_id: str | None) -> str:
-        return f'deep::{profile_id or "default"}::{ text.strip().lower() }'
+        return f'deep::{self._key_suffix(text, profile_id)}'
 
     async def set_quick(self, text: str, profile_id: str | None, payload: Any) -> None:
         key = self._quick_key(text, profile_id)
-        await self._client.set_json(key, json.dumps(payload), get_settings().quick_cache_ttl)
+        await self._client.set_json(key, payload, self._quick_ttl)
 
     async def get_quick(self, text: str, profile_id: str | None) -> Any | None:
         key = self._quick_key(text, profile_id)
-        value = await self._client.get_json(key)
-        return json.loads(value) if value else None
+        return await self._client.get_json(key)
 
-    async def set_deep(self, text: str, profile_id: str | None, payload: Any) -> None:
-        key = self._deep_key(text, profile_id)
-        await self._client.set_json(key, json.dumps(payload), get_settings().deep_cache_ttl)
+    async def set_deep(
+        self,
+        text: str,
+        profile_id: str | None,
+        payload: Any,
+        replay: bytes | None = None
+    ) -> None:
+        # The payload and its pre-encoded SSE replay go out in a single round-trip.
+        suffix = self._key_suffix(text, profile_id)
+        async with self._client.pipeline() as pipe:
+            pipe.set(f'deep::{suffix}', dump_json(payload), ex=self._deep_ttl)
+            if replay is not None:
+                pipe.set(f'deep-sse::{DEEP_REPLAY_VERSION}::{suffix}', replay, ex=self._deep_ttl)
+            await pipe.execute()
 
     async def get_deep(self, text: str, profile_id: str | None) -> Any | None:
         key = self._deep_key(text, profile_id)
-        value = await self._client.get_json(key)
-        return json.loads(value) if value else None
+        return await self._client.get_json(key)
+
+    async def get_deep_many(self, entries: list[tuple[str, str | None]]) -> list[Any | None]:
+        """Look up several (text, profile_id) pairs with a single MGET."""
+        return await self._client.mget_json([self._deep_key(text, profile_id) for text, profile_id in entries])
+
+    async def get_deep_replay(self, text: str, profile_id: str | None) -> tuple[str | None, Any | None]:
+        """Return the pre-built SSE replay, or the cached payload when no replay exists."""
+        suffix = self._key_suffix(text, profile_id)
+        async with self._client.pipeline() as pipe:
+            pipe.get(f'deep-sse::{DEEP_REPLAY_VERSION}::{suffix}')
+            pipe.get(f'deep::{suffix}')
+            replay, raw = await pipe.execute()
+        if replay:
+            return replay, None
+        return None, orjson.loads(raw) if raw else None
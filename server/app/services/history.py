@@ -1,45 +1,96 @@
 from __future__ import annotations
 
-import json
 from typing import List
 
+import orjson
+from pydantic import TypeAdapter
+
 from ..core.cache import CacheClient, get_cache
+from ..core.serialization import dump_json
 from ..schemas.history import HistoryEntry
 
 HISTORY_KEY = 'history::entries'
+HISTORY_PAYLOAD_KEY = 'history::payloads'
 HISTORY_LIMIT = 300
 
+_HISTORY_LIST = TypeAdapter(List[HistoryEntry])
+
+# Store the payload, index it and trim past the limit atomically, so concurrent
+# saves cannot interleave between the trim and the payload cleanup.
+# KEYS: sorted set, payload hash. ARGV: id, payload, createdAt, limit.
+_SAVE_SCRIPT = '''
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+local overflow = -(tonumber(ARGV[4]) + 1)
+local evicted = redis.call('ZRANGE', KEYS[1], 0, overflow)
+if #evicted > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, overflow)
+    redis.call('HDEL', KEYS[2], unpack(evicted))
+end
+return #evicted
+'''
+
 
 class HistoryStore:
     def __init__(self, client: CacheClient):
         self._client = client
+        self._save_script = None
 
     @classmethod
     async def create(cls) -> 'HistoryStore':
         client = await get_cache()
         return cls(client)
 
-    async def list_history(self) -> List[HistoryEntry]:
-        raw = await self._client.get_json(HISTORY_KEY)
-        if not raw:
+    async def migrate_legacy(self) -> None:
+        """Convert history left in an older layout under HISTORY_KEY.
+
+        Releases before the sorted set kept the whole history as one JSON string,
+        which makes ZADD/ZREVRANGE fail with WRONGTYPE, so it is rewritten once
+        at startup.
+        """
+        redis = self._client.raw
+        if await redis.type(HISTORY_KEY) != 'string':
+            return
+        raw = await redis.get(HISTORY_KEY)
+        items = orjson.loads(raw) if raw else []
+
+        # The legacy list is newest-first, so the first copy of an id wins.
+        entries: dict[str, HistoryEntry] = {}
+        for item in items:
+            entry = HistoryEntry.model_validate(item)
+            entries.setdefault(entry.id, entry)
+        kept = sorted(entries.values(), key=lambda entry: entry.createdAt, reverse=True)[:HISTORY_LIMIT]
+
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(HISTORY_KEY)
+            if kept:
+                pipe.hset(HISTORY_PAYLOAD_KEY, mapping={entry.id: dump_json(entry) for entry in kept})
+                pipe.zadd(HISTORY_KEY, {entry.id: entry.createdAt for entry in kept})
+            await pipe.execute()
+
+    async def list_history(self, limit: int = HISTORY_LIMIT) -> List[HistoryEntry]:
+        # Ids live in a sorted set scored by createdAt, so Redis hands them back
+        # newest-first; payloads are fetched from the companion hash in one call.
+        entry_ids = await self._client.zrevrange(HISTORY_KEY, 0, limit - 1)
+        if not entry_ids:
             return []
-        data = json.loads(raw)
-        entries = [HistoryEntry.model_validate(item) for item in data]
-        entries.sort(key=lambda item: item.createdAt, reverse=True)
-        return entries
+        raw_items = await self._client.hmget(HISTORY_PAYLOAD_KEY, entry_ids)
+        return _HISTORY_LIST.validate_json('[' + ','.join(raw for raw in raw_items if raw) + ']')
 
     async def save_entry(self, entry: HistoryEntry) -> HistoryEntry:
-        entries = await self.list_history()
-        filtered = [item for item in entries if item.id != entry.id]
-        updated = [entry, *filtered][:HISTORY_LIMIT]
-        payload = json.dumps([item.model_dump() for item in updated])
-        await self._client.set_json(HISTORY_KEY, payload, ttl=None)
+        if self._save_script is None:
+            self._save_script = self._client.raw.register_script(_SAVE_SCRIPT)
+        await self._save_script(
+            keys=[HISTORY_KEY, HISTORY_PAYLOAD_KEY],
+            args=[entry.id, dump_json(entry), entry.createdAt, HISTORY_LIMIT]
+        )
         return entry
 
     async def delete_entry(self, entry_id: str) -> None:
-        entries = [item for item in await self.list_history() if item.id != entry_id]
-        payload = json.dumps([item.model_dump() for item in entries])
-        await self._client.set_json(HISTORY_KEY, payload, ttl=None)
+        async with self._client.raw.pipeline(transaction=True) as pipe:
+            pipe.zrem(HISTORY_KEY, entry_id)
+            pipe.hdel(HISTORY_PAYLOAD_KEY, entry_id)
+            await pipe.execute()
 
     async def clear(self) -> None:
-        await self._client.set_json(HISTORY_KEY, '[]', ttl=None)
+        await self._client.delete(HISTORY_KEY, HISTORY_PAYLOAD_KEY)
@@ -1,23 +1,43 @@
 from __future__ import annotations
 
-from typing import Iterable, Sequence
+import heapq
+from typing import Iterable, Iterator, Sequence
 
 from ..schemas.explain import SourceReference
 
+CREDIBILITY_WEIGHT = {'high': 3, 'medium': 2, 'low': 1}
 
-def merge_sources(*source_groups: Iterable[SourceReference]) -> list[SourceReference]:
+
+def _unique_sources(source_groups: Iterable[Iterable[SourceReference]]) -> Iterator[SourceReference]:
+    # The single dedup rule: first occurrence of a (url, title) pair wins.
     seen = set()
-    merged: list[SourceReference] = []
     for group in source_groups:
         for source in group:
             key = (source.url, source.title)
             if key in seen:
                 continue
             seen.add(key)
-            merged.append(source)
-    return merged
+            yield source
+
+
+def merge_sources(*source_groups: Iterable[SourceReference]) -> list[SourceReference]:
+    return list(_unique_sources(source_groups))
+
+
+def _rank_key(source: SourceReference) -> tuple[int, str]:
+    return -CREDIBILITY_WEIGHT.get(source.credibility, 0), source.title
 
 
 def rank_sources(sources: Sequence[SourceReference]) -> list[SourceReference]:
-    weight = {'high': 3, 'medium': 2, 'low': 1}
-    return sorted(sources, key=lambda src: (-weight.get(src.credibility, 0), src.title))
+    return sorted(sources, key=_rank_key)
+
+
+def merge_and_rank(
+    *source_groups: Iterable[SourceReference], top_k: int | None = None
+) -> list[SourceReference]:
+    # No cap by default, matching rank_sources(merge_sources(...)); with top_k
+    # only the best top_k are selected instead of sorting everything.
+    unique = _unique_sources(source_groups)
+    if top_k is None:
+        return sorted(unique, key=_rank_key)
+    return heapq.nsmallest(top_k, unique, key=_rank_key)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 from time import time
-from typing import Iterable, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+import msgpack
+import orjson
 
 from ..schemas.model import ModelConfig
 
@@ -13,24 +18,100 @@ DB_DIR = Path(__file__).resolve().parents[3] / 'data'
 DB_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DB_DIR / 'profiles.db'
 
+# SQLite allows one writer at a time anyway; a private worker keeps model
+# lookups from queueing behind unrelated jobs in the default thread pool.
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='modelrepo')
+
+T = TypeVar('T')
+
+
+async def _in_db_thread(func: Callable[..., T], *args: Any) -> T:
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, func, *args)
+
+
+_UNSET: Any = object()
+
+
+def _pack(payload: dict) -> bytes:
+    return msgpack.packb(payload, use_bin_type=True)
+
+
+def _unpack(raw: bytes) -> dict:
+    return msgpack.unpackb(raw, raw=False)
+
+
+# Every query is issued by name from this table so the SQL text is identical
+# on each call and pysqlite's statement cache reuses the compiled statement.
+_STATEMENTS = {
+    'list': '''
+        SELECT payload, is_default, updated_at FROM model_configs
+        ORDER BY is_default DESC, updated_at DESC
+    ''',
+    'get': 'SELECT payload, is_default, updated_at FROM model_configs WHERE id = ?',
+    'get_default': '''
+        SELECT payload, is_default, updated_at FROM model_configs
+        WHERE is_default = 1
+        ORDER BY updated_at DESC
+        LIMIT 1
+    ''',
+    'upsert': '''
+        INSERT INTO model_configs (id, payload, is_default, created_at, updated_at)
+        VALUES (:id, :payload, :is_default, :created_at, :updated_at)
+        ON CONFLICT(id) DO UPDATE SET
+            payload = excluded.payload,
+            is_default = excluded.is_default,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at
+    ''',
+    'delete': 'DELETE FROM model_configs WHERE id = ?',
+    'clear_default': 'UPDATE model_configs SET is_default = 0 WHERE is_default = 1 AND id IS NOT ?',
+    'mark_default': 'UPDATE model_configs SET is_default = 1, updated_at = ? WHERE id = ?',
+}
+
 
 class ModelRepository:
     def __init__(self, db_path: Optional[Path] = None) -> None:
         self._path = Path(db_path or DB_PATH)
+        # One long-lived connection keeps SQLite's page cache warm across calls;
+        # the lock also covers synchronous callers outside the database thread.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        # Model configs change rarely, so reads are served from memory until the
+        # next write. Cached instances are shared and must be treated as read-only.
+        self._models: dict[str, ModelConfig] = {}
+        self._default: ModelConfig | None = _UNSET
+        self._listing: list[ModelConfig] | None = None
         self._ensure_schema()
 
-    def _get_connection(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(self._path)
-        connection.row_factory = sqlite3.Row
-        return connection
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _run(self, name: str, params: Iterable | dict = ()) -> sqlite3.Cursor:
+        return self._conn.execute(_STATEMENTS[name], params)
+
+    def _invalidate(self) -> None:
+        self._models.clear()
+        self._default = _UNSET
+        self._listing = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
     def _ensure_schema(self) -> None:
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA cache_size=-64000')
         with self._get_connection() as connection:
             connection.execute(
                 '''
                 CREATE TABLE IF NOT EXISTS model_configs (
                     id TEXT PRIMARY KEY,
-                    payload TEXT NOT NULL,
+                    payload BLOB NOT NULL,
                     is_default INTEGER NOT NULL DEFAULT 0,
                     created_at INTEGER NOT NULL,
                     updated_at INTEGER NOT NULL
@@ -40,142 +121,113 @@ class ModelRepository:
             connection.execute(
                 'CREATE INDEX IF NOT EXISTS idx_model_configs_default ON model_configs(is_default)'
             )
+            # Rows written before payloads moved to msgpack still hold JSON text.
+            legacy_rows = connection.execute(
+                "SELECT id, payload FROM model_configs WHERE typeof(payload) = 'text'"
+            ).fetchall()
+            connection.executemany(
+                'UPDATE model_configs SET payload = ? WHERE id = ?',
+                [(_pack(orjson.loads(row['payload'])), row['id']) for row in legacy_rows],
+            )
+
+    @staticmethod
+    def _row_to_payload(row: sqlite3.Row) -> dict:
+        # The columns are authoritative for the default flag and its timestamp;
+        # payloads written before they were split out may still carry stale copies.
+        payload = _unpack(row['payload'])
+        payload['isDefault'] = bool(row['is_default'])
+        payload['updatedAt'] = row['updated_at']
+        return payload
 
     def _row_to_model(self, row: sqlite3.Row) -> ModelConfig:
-        data = json.loads(row['payload'])
-        return ModelConfig.model_validate(data)
+        # Payloads are only ever written from validated models in save_model, so
+        # reads skip re-validation.
+        return ModelConfig.model_construct(**self._row_to_payload(row))
 
     def list_models(self) -> list[ModelConfig]:
-        with self._get_connection() as connection:
-            rows = connection.execute(
-                '''
-                SELECT payload FROM model_configs
-                ORDER BY is_default DESC, updated_at DESC
-                '''
-            ).fetchall()
-        return [self._row_to_model(row) for row in rows]
+        listing = self._listing
+        if listing is None:
+            with self._get_connection():
+                rows = self._run('list').fetchall()
+                listing = [self._row_to_model(row) for row in rows]
+                self._listing = listing
+                self._models.update((model.id, model) for model in listing)
+        return list(listing)
 
     def get_model(self, model_id: str) -> ModelConfig | None:
-        with self._get_connection() as connection:
-            row = connection.execute(
-                'SELECT payload FROM model_configs WHERE id = ?',
-                (model_id,),
-            ).fetchone()
-        return self._row_to_model(row) if row else None
+        model = self._models.get(model_id)
+        if model is None:
+            with self._get_connection():
+                row = self._run('get', (model_id,)).fetchone()
+                if row is None:
+                    return None
+                model = self._models[model_id] = self._row_to_model(row)
+        return model
 
     def save_model(self, model: ModelConfig) -> ModelConfig:
-        payload = model.model_dump()
+        payload = model.model_dump(exclude={'isDefault', 'updatedAt'})
         is_default = 1 if model.isDefault else 0
-        with self._get_connection() as connection:
+        with self._get_connection():
+            self._invalidate()
             if is_default:
-                connection.execute('UPDATE model_configs SET is_default = 0')
-                self._clear_default_flag(connection, exclude_ids=[model.id])
-            connection.execute(
-                '''
-                INSERT INTO model_configs (id, payload, is_default, created_at, updated_at)
-                VALUES (:id, :payload, :is_default, :created_at, :updated_at)
-                ON CONFLICT(id) DO UPDATE SET
-                    payload = excluded.payload,
-                    is_default = excluded.is_default,
-                    created_at = excluded.created_at,
-                    updated_at = excluded.updated_at
-                ''',
+                self._run('clear_default', (model.id,))
+            self._run(
+                'upsert',
                 {
                     'id': model.id,
-                    'payload': json.dumps(payload),
+                    'payload': _pack(payload),
                     'is_default': is_default,
-                    'created_at': payload.get('createdAt', int(time() * 1000)),
-                    'updated_at': payload.get('updatedAt', int(time() * 1000)),
+                    'created_at': model.createdAt,
+                    'updated_at': model.updatedAt,
                 },
             )
-        return self.get_model(model.id) or model
+        return model
 
     def delete_model(self, model_id: str) -> None:
-        with self._get_connection() as connection:
-            connection.execute('DELETE FROM model_configs WHERE id = ?', (model_id,))
+        with self._get_connection():
+            self._invalidate()
+            self._run('delete', (model_id,))
 
     def set_default(self, model_id: str | None) -> ModelConfig | None:
-        now_ms = int(time() * 1000)
-        default_model: ModelConfig | None = None
-        with self._get_connection() as connection:
-            rows = connection.execute(
-                'SELECT id, payload FROM model_configs'
-            ).fetchall()
-            for row in rows:
-                payload = json.loads(row['payload'])
-                is_default = bool(model_id) and row['id'] == model_id
-                payload['isDefault'] = is_default
-                if is_default:
-                    payload['updatedAt'] = now_ms
-                    default_model = ModelConfig.model_validate(payload)
-                    updated_at = now_ms
-                else:
-                    updated_at = payload.get('updatedAt', now_ms)
-                connection.execute(
-                    '''
-                    UPDATE model_configs
-                    SET payload = :payload,
-                        is_default = :is_default,
-                        updated_at = :updated_at
-                    WHERE id = :id
-                    ''',
-                    {
-                        'id': row['id'],
-                        'payload': json.dumps(payload),
-                        'is_default': 1 if is_default else 0,
-                        'updated_at': updated_at,
-                    },
-                )
-        return default_model
+        with self._get_connection():
+            self._invalidate()
+            self._run('clear_default', (model_id,))
+            if model_id:
+                self._run('mark_default', (int(time() * 1000), model_id))
+        return self.get_model(model_id) if model_id else None
 
     def get_default(self) -> ModelConfig | None:
-        with self._get_connection() as connection:
-            row = connection.execute(
-                '''
-                SELECT payload FROM model_configs
-                WHERE is_default = 1
-                ORDER BY updated_at DESC
-                LIMIT 1
-                '''
-            ).fetchone()
-        return self._row_to_model(row) if row else None
-
-    def _clear_default_flag(self, connection: sqlite3.Connection, exclude_ids: Iterable[str] | None = None) -> None:
-        exclude = set(exclude_ids or [])
-        rows = connection.execute('SELECT id, payload FROM model_configs').fetchall()
-        for row in rows:
-            if row['id'] in exclude:
-                continue
-            payload = json.loads(row['payload'])
-            if payload.get('isDefault'):
-                payload['isDefault'] = False
-                connection.execute(
-                    '''
-                    UPDATE model_configs
-                    SET payload = :payload,
-                        is_default = 0
-                    WHERE id = :id
-                    ''',
-                    {
-                        'id': row['id'],
-                        'payload': json.dumps(payload),
-                    },
-                )
-
+        default = self._default
+        if default is _UNSET:
+            with self._get_connection():
+                row = self._run('get_default').fetchone()
+                default = self._default = self._row_to_model(row) if row else None
+        return default
+
+    # Cache hits are plain dict reads, so the async variants only hop to the
+    # database thread when SQLite actually has to be queried.
     async def a_list_models(self) -> list[ModelConfig]:
-        return await asyncio.to_thread(self.list_models)
+        if self._listing is not None:
+            return list(self._listing)
+        return await _in_db_thread(self.list_models)
 
     async def a_get_model(self, model_id: str) -> ModelConfig | None:
-        return await asyncio.to_thread(self.get_model, model_id)
+        model = self._models.get(model_id)
+        if model is not None:
+            return model
+        return await _in_db_thread(self.get_model, model_id)
 
     async def a_save_model(self, model: ModelConfig) -> ModelConfig:
-        return await asyncio.to_thread(self.save_model, model)
+        return await _in_db_thread(self.save_model, model)
 
     async def a_delete_model(self, model_id: str) -> None:
-        await asyncio.to_thread(self.delete_model, model_id)
+        await _in_db_thread(self.delete_model, model_id)
 
     async def a_set_default(self, model_id: str | None) -> ModelConfig | None:
-        return await asyncio.to_thread(self.set_default, model_id)
+        return await _in_db_thread(self.set_default, model_id)
 
     async def a_get_default(self) -> ModelConfig | None:
-        return await asyncio.to_thread(self.get_default)
+        default = self._default
+        if default is not _UNSET:
+            return default
+        return await _in_db_thread(self.get_default)
@@ -1,119 +1,163 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import re
 from typing import List
 
 import httpx
+import orjson
 
 from ..schemas.explain import SourceReference
 
+logger = logging.getLogger(__name__)
+
 URBAN_URL = 'https://api.urbandictionary.com/v0/define'
 WIKI_URL = 'https://en.wikipedia.org/api/rest_v1/page/summary/'
 
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    # One pooled client per process so Urban Dictionary and Wikipedia lookups
+    # reuse warm TLS connections instead of handshaking on every request.
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=5.0,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _client
+
+
+async def close_online_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# Common stop words to filter out
+_STOP_WORDS = frozenset({
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
+    'could', 'may', 'might', 'must', 'can', 'of', 'at', 'by', 'for', 'with',
+    'about', 'against', 'between', 'into', 'through', 'during', 'before',
+    'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out',
+    'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once',
+    'here', 'there', 'when', 'where', 'why', 'how', 'all', 'both', 'each',
+    'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
+    'only', 'own', 'same', 'so', 'than', 'too', 'very', 'you', 'your',
+    'yours', 'he', 'him', 'his', 'she', 'her', 'hers', 'it', 'its', 'we',
+    'us', 'our', 'ours', 'they', 'them', 'their', 'theirs', 'what', 'which',
+    'who', 'whom', 'this', 'that', 'these', 'those', 'i', 'me', 'my', 'mine',
+    'am', 'know', 'kind', 'stuff', 'thing', 'things', 'like', 'just', 'really'
+})
+
+# Remove punctuation except hyphens. ASCII subtitles go through str.translate;
+# anything else keeps the Unicode-aware regex so non-Latin punctuation is still stripped.
+_PUNCT_TABLE = str.maketrans('', '', ''.join(
+    ch for ch in map(chr, range(128)) if not (ch.isalnum() or ch in '_- \t\n\r\x0b\x0c')
+))
+_PUNCT_RE = re.compile(r'[^\w\s\-]')
+
 
 def extract_keywords(text: str) -> List[str]:
     """Extract potential slang keywords from a sentence."""
-    # Remove common stop words and punctuation
-    text = text.lower().strip()
-    # Remove punctuation except hyphens
-    text = re.sub(r'[^\w\s\-]', '', text)
-    
-    # Common stop words to filter out
-    stop_words = {
-        'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-        'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'should',
-        'could', 'may', 'might', 'must', 'can', 'of', 'at', 'by', 'for', 'with',
-        'about', 'against', 'between', 'into', 'through', 'during', 'before',
-        'after', 'above', 'below', 'to', 'from', 'up', 'down', 'in', 'out',
-        'on', 'off', 'over', 'under', 'again', 'further', 'then', 'once',
-        'here', 'there', 'when', 'where', 'why', 'how', 'all', 'both', 'each',
-        'few', 'more', 'most', 'other', 'some', 'such', 'no', 'nor', 'not',
-        'only', 'own', 'same', 'so', 'than', 'too', 'very', 'you', 'your',
-        'yours', 'he', 'him', 'his', 'she', 'her', 'hers', 'it', 'its', 'we',
-        'us', 'our', 'ours', 'they', 'them', 'their', 'theirs', 'what', 'which',
-        'who', 'whom', 'this', 'that', 'these', 'those', 'i', 'me', 'my', 'mine',
-        'am', 'know', 'kind', 'stuff', 'thing', 'things', 'like', 'just', 'really'
-    }
-    
-    words = text.split()
-    keywords = [w for w in words if w and w not in stop_words and len(w) > 2]
-    
+    text = text.lower()
+    text = text.translate(_PUNCT_TABLE) if text.isascii() else _PUNCT_RE.sub('', text)
+
+    keywords: List[str] = []
     # Also try bigrams for phrases like "blow off", "hang out"
-    bigrams = []
-    for i in range(len(words) - 1):
-        if words[i] not in stop_words or words[i+1] not in stop_words:
-            bigrams.append(f"{words[i]} {words[i+1]}")
-    
+    bigrams: List[str] = []
+    # Single pass: each word is probed once and its stop-word flag is carried
+    # forward for the bigram it forms with the next word.
+    prev: str | None = None
+    prev_content = False
+    for word in text.split():
+        content = word not in _STOP_WORDS
+        if content and len(word) > 2:
+            keywords.append(word)
+        if prev is not None and (prev_content or content):
+            bigrams.append(f'{prev} {word}')
+        prev, prev_content = word, content
+
     return keywords + bigrams
 
 
 async def fetch_urban_dictionary(query: str) -> List[SourceReference]:
-    print(f'[LinguaLens] 正在查询 Urban Dictionary: {query}')
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        # Try full query first
-        response = await client.get(URBAN_URL, params={'term': query})
-        response.raise_for_status()
-        data = response.json()
-        entries = data.get('list', [])
-        print(f'[LinguaLens] Urban Dictionary 完整查询返回 {len(entries)} 个条目')
+    logger.debug('正在查询 Urban Dictionary: %s', query)
+    client = _get_client()
+    # Try full query first
+    response = await client.get(URBAN_URL, params={'term': query})
+    response.raise_for_status()
+    data = orjson.loads(response.content)
+    entries = data.get('list', [])
+    logger.debug('Urban Dictionary 完整查询返回 %d 个条目', len(entries))
+    
+    # If no results, try extracting keywords
+    if not entries:
+        keywords = extract_keywords(query)
+        logger.debug('提取的关键词: %s', keywords[:3])
+        candidates = keywords[:3]  # Try up to 3 keywords
+        # Fire the fallbacks together and keep the first hit in keyword order.
+        responses = await asyncio.gather(
+            *(client.get(URBAN_URL, params={'term': keyword}) for keyword in candidates),
+            return_exceptions=True
+        )
+        for keyword, response in zip(candidates, responses):
+            if isinstance(response, Exception) or response.is_error:
+                continue
+            entries = orjson.loads(response.content).get('list', [])
+            if entries:
+                logger.debug('关键词 "%s" 查询返回 %d 个条目', keyword, len(entries))
+                break
+    
+    sources: List[SourceReference] = []
+    # Sort entries by thumbs_up to get better quality definitions first
+    sorted_entries = sorted(
+        entries[:10],  # Check top 10 entries
+        key=lambda e: e.get('thumbs_up', 0),
+        reverse=True
+    )
+    
+    for entry in sorted_entries:
+        # Clean up the definition text
+        definition = entry.get('definition', '').replace('[', '').replace(']', '').strip()
         
-        # If no results, try extracting keywords
-        if not entries:
-            keywords = extract_keywords(query)
-            print(f'[LinguaLens] 提取的关键词: {keywords[:3]}')
-            for keyword in keywords[:3]:  # Try up to 3 keywords
-                response = await client.get(URBAN_URL, params={'term': keyword})
-                response.raise_for_status()
-                data = response.json()
-                entries = data.get('list', [])
-                if entries:
-                    print(f'[LinguaLens] 关键词 "{keyword}" 查询返回 {len(entries)} 个条目')
-                    break
+        # Skip definitions that are too short (likely jokes like "Me", "you", etc.)
+        if len(definition) < 20:
+            logger.debug('跳过过短的定义: "%s"', definition)
+            continue
         
-        sources: List[SourceReference] = []
-        # Sort entries by thumbs_up to get better quality definitions first
-        sorted_entries = sorted(
-            entries[:10],  # Check top 10 entries
-            key=lambda e: e.get('thumbs_up', 0),
-            reverse=True
-        )
+        # Skip definitions that are just single words
+        if len(definition.split()) < 3:
+            logger.debug('跳过单词定义: "%s"', definition)
+            continue
         
-        for entry in sorted_entries:
-            # Clean up the definition text
-            definition = entry.get('definition', '').replace('[', '').replace(']', '').strip()
-            
-            # Skip definitions that are too short (likely jokes like "Me", "you", etc.)
-            if len(definition) < 20:
-                print(f'[LinguaLens] 跳过过短的定义: "{definition}"')
-                continue
-            
-            # Skip definitions that are just single words
-            if len(definition.split()) < 3:
-                print(f'[LinguaLens] 跳过单词定义: "{definition}"')
-                continue
-            
-            if len(definition) > 200:
-                definition = definition[:197] + '...'
-            
-            sources.append(
-                SourceReference(
-                    title=f"Urban Dictionary: {entry.get('word')}",
-                    url=entry.get('permalink', ''),
-                    credibility='medium',
-                    excerpt=definition
-                )
+        if len(definition) > 200:
+            definition = definition[:197] + '...'
+        
+        sources.append(
+            SourceReference(
+                title=f"Urban Dictionary: {entry.get('word')}",
+                url=entry.get('permalink', ''),
+                credibility='medium',
+                excerpt=definition
             )
-            
-            # Stop after finding 2 good sources
-            if len(sources) >= 2:
-                break
+        )
         
-        print(f'[LinguaLens] Urban Dictionary 返回 {len(sources)} 个有效来源')
-        return sources
+        # Stop after finding 2 good sources
+        if len(sources) >= 2:
+            break
+    
+    logger.debug('Urban Dictionary 返回 %d 个有效来源', len(sources))
+    return sources
 
 
 async def fetch_wikipedia_summary(query: str) -> List[SourceReference]:
-    print(f'[LinguaLens] 正在查询 Wikipedia: {query}')
+    logger.debug('正在查询 Wikipedia: %s', query)
     
     # Try full query first
     queries_to_try = [query]
@@ -123,21 +167,42 @@ async def fetch_wikipedia_summary(query: str) -> List[SourceReference]:
         keywords = extract_keywords(query)
         queries_to_try.extend(keywords[:2])
     
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for q in queries_to_try:
-            safe_query = q.replace(' ', '_')
-            response = await client.get(f'{WIKI_URL}{safe_query}')
-            if response.status_code == 200:
-                data = response.json()
-                print(f'[LinguaLens] Wikipedia 查询 "{q}" 成功')
-                return [
-                    SourceReference(
-                        title=data.get('title', q),
-                        url=data.get('content_urls', {}).get('desktop', {}).get('page', ''),
-                        credibility='high',
-                        excerpt=data.get('extract', '')[:200] + ('...' if len(data.get('extract', '')) > 200 else '')
-                    )
-                ]
-        
-        print(f'[LinguaLens] Wikipedia 所有查询均无结果')
-        return []
+    client = _get_client()
+    responses = await asyncio.gather(
+        *(client.get(f"{WIKI_URL}{q.replace(' ', '_')}") for q in queries_to_try),
+        return_exceptions=True
+    )
+    for q, response in zip(queries_to_try, responses):
+        if isinstance(response, Exception):
+            continue
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            logger.debug('Wikipedia 查询 "%s" 成功', q)
+            return [
+                SourceReference(
+                    title=data.get('title', q),
+                    url=data.get('content_urls', {}).get('desktop', {}).get('page', ''),
+                    credibility='high',
+                    excerpt=data.get('extract', '')[:200] + ('...' if len(data.get('extract', '')) > 200 else '')
+                )
+            ]
+    
+    logger.debug('Wikipedia 所有查询均无结果')
+    return []
+
+
+async def fetch_online_sources(query: str) -> List[SourceReference]:
+    """Query Urban Dictionary and Wikipedia concurrently; a failing provider is skipped."""
+    results = await asyncio.gather(
+        fetch_urban_dictionary(query),
+        fetch_wikipedia_summary(query),
+        return_exceptions=True
+    )
+    sources: List[SourceReference] = []
+    for label, result in zip(('Urban Dictionary', 'Wikipedia'), results):
+        if isinstance(result, Exception):
+            logger.warning('%s 调用失败: %s', label, result)
+            continue
+        sources.extend(result)
+        logger.debug('%s 返回 %d 个来源', label, len(result))
+    return sources
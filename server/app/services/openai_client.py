@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import random
 import re
-from time import time
-from typing import Any
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache, wraps
+from time import time, time_ns
+from typing import Any, AsyncIterator, Callable, Final
 
 import httpx
+import orjson
+from xxhash import xxh3_64_hexdigest
 
 from ..core.config import get_settings
+from ..dependencies import get_model_store
 from ..schemas.explain import (
     DeepExplainResponse,
     ExplainRequest,
@@ -16,13 +24,31 @@ from ..schemas.explain import (
     QuickExplainResponse
 )
 from ..schemas.model import ModelConfig
-from ..services.models import ModelStore
+from ..schemas.profile import ProfileTemplate
 
 logger = logging.getLogger(__name__)
 
+MAX_CACHED_CLIENTS = 16
+QUICK_MEMO_SIZE = 256
+QUICK_BATCH_CONCURRENCY = 20
+# Batch API jobs finish within a 24h window, so polling starts slow and backs off.
+BATCH_POLL_INITIAL_SECONDS = 30.0
+BATCH_POLL_MAX_SECONDS = 600.0
+# Transient upstream failures are retried with full-jitter exponential backoff.
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+RETRY_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
+# How much streamed deep output to scan for the lang field before giving up.
+LANG_PROBE_CHARS = 512
+
+# Bodies are pre-encoded with orjson and sent as content=, so the type is set per
+# call rather than on the client, where it would also clobber multipart uploads.
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
 DEFAULT_PROFILE_PREFERENCE = 'Explain concepts with relatable, everyday examples.'
 
-LANGUAGE_ALIASES: dict[str, str] = {
+LANGUAGE_ALIASES: Final[dict[str, str]] = {
     'en': 'en',
     'en-us': 'en',
     'en-gb': 'en',
@@ -75,7 +101,7 @@ LANGUAGE_ALIASES: dict[str, str] = {
     'ru-ru': 'ru'
 }
 
-SUPPORTED_LANGUAGE_CODES = {
+SUPPORTED_LANGUAGE_CODES: Final[frozenset[str]] = frozenset({
     'en',
     'zh-cn',
     'zh-tw',
@@ -86,13 +112,21 @@ SUPPORTED_LANGUAGE_CODES = {
     'de',
     'pt',
     'ru'
-}
+})
 
 
 def _normalize_language_code(code: str | None) -> str | None:
     if not code:
         return None
-    normalized = code.strip().lower().replace('_', '-')
+    key = code.strip().lower()
+    resolved = _RESOLVED_LANGUAGE_CODES.get(key)
+    if resolved:
+        return resolved
+    return _resolve_language_code(key)
+
+
+def _resolve_language_code(key: str) -> str | None:
+    normalized = key.replace('_', '-')
     if not normalized:
         return None
     alias = LANGUAGE_ALIASES.get(normalized)
@@ -106,106 +140,351 @@ def _normalize_language_code(code: str | None) -> str | None:
     return normalized
 
 
+# Every known spelling (aliases in both separator styles, plus the supported
+# codes) resolved up front, so the common case is a single dict lookup.
+_RESOLVED_LANGUAGE_CODES: Final[dict[str, str]] = {
+    spelling: _resolve_language_code(spelling)
+    for code in (*LANGUAGE_ALIASES, *SUPPORTED_LANGUAGE_CODES)
+    for spelling in (code, code.replace('_', '-'), code.replace('-', '_'))
+}
+
+
 def _effective_primary_language(request: ExplainRequest) -> str:
     profile_language = None
     if request.profile and getattr(request.profile, 'primaryLanguage', None):
         profile_language = _normalize_language_code(request.profile.primaryLanguage)
-        print(f'[LinguaLens] Profile primary language: {request.profile.primaryLanguage} -> normalized: {profile_language}')
     request_language = _normalize_language_code(request.languages.primary) or request.languages.primary
-    print(f'[LinguaLens] Request language: {request.languages.primary} -> normalized: {request_language}')
     effective = profile_language or request_language or 'en'
-    print(f'[LinguaLens] Effective primary language: {effective}')
+    logger.debug(
+        'Primary language for %s: profile=%s request=%s -> %s',
+        request.requestId,
+        profile_language,
+        request_language,
+        effective
+    )
     return effective
 
 
-def _quick_text_format() -> dict[str, Any]:
-    return {
-        'format': {
-            'type': 'json_schema',
-            'name': 'json_schema',
-            'strict': True,
-            'schema': {
-                'type': 'object',
-                'properties': {
-                    'literal': {'type': 'string'},
-                    'context': {'type': 'string'}
-                },
-                'required': ['literal', 'context'],
-                'additionalProperties': False
-            }
+def _quick_memo_key(request: ExplainRequest) -> str:
+    # updatedAt is part of the key so an edited profile stops matching answers
+    # written for its previous version.
+    profile = request.profile
+    profile_ref = f'{profile.id}@{profile.updatedAt}' if profile else request.profileId
+    languages = request.languages
+    raw = f'{request.subtitleText}\x1f{request.surrounding or ""}\x1f{languages.primary}\x1f{languages.secondary or ""}\x1f{profile_ref or ""}'
+    return xxh3_64_hexdigest(raw.encode('utf-8'))
+
+
+PROFILE_TEXT_CACHE_SIZE = 1024
+_profile_texts: OrderedDict[tuple, str] = OrderedDict()
+
+
+def _profile_digest(profile: ProfileTemplate) -> str:
+    # Ids and updatedAt come from the client, so two users can send the same
+    # pair with different content; the cache is keyed on the content itself.
+    return xxh3_64_hexdigest(profile.model_dump_json().encode('utf-8'))
+
+
+def _profile_text(key: tuple, render: Callable[[], str]) -> str:
+    # Keyed on profile digests, so repeat requests with an unchanged profile
+    # reuse the rendered block.
+    text = _profile_texts.get(key)
+    if text is None:
+        text = _profile_texts[key] = render()
+        if len(_profile_texts) > PROFILE_TEXT_CACHE_SIZE:
+            _profile_texts.popitem(last=False)
+    else:
+        _profile_texts.move_to_end(key)
+    return text
+
+
+def _render_quick_profile(profile: ProfileTemplate) -> str:
+    demographics = profile.demographics
+    cultures = ', '.join(profile.cultures)
+    return (
+        f"User profile: {profile.name} (id: {profile.id})\n"
+        f"Profile locale: {demographics.region}\n"
+        f"Cultural focus: {cultures or 'none'}\n"
+        f"Demographics: age_range={demographics.ageRange}, region={demographics.region}, occupation={demographics.occupation}, gender={demographics.gender or 'unspecified'}\n"
+        f"Tone preference: {profile.tone}\n"
+        f"Personal preference: {profile.personalPreference or DEFAULT_PROFILE_PREFERENCE}\n"
+        f"Learning goals: {profile.goals or 'none specified'}\n"
+        f"Description: {profile.description}\n"
+        f"Adjust literal/context to resonate with {profile.name} while staying accurate and concise.\n"
+        f"Use examples tied to {cultures or 'their cultural background'} and relatable situations in {demographics.region}.\n"
+        f"Keep explanations aligned with the desired tone ({profile.tone}) and highlight implications relevant to {profile.goals or 'their learning goals'}.\n"
+        'When cultural nuance or slang appears, compare it to a concept familiar to the profile.\n'
+    )
+
+
+def _render_variant_profile(profile: ProfileTemplate) -> str:
+    demographics = profile.demographics
+    return (
+        f"- {profile.id}: {profile.name}; "
+        f"demographics(age_range={demographics.ageRange}, region={demographics.region}, occupation={demographics.occupation}, gender={demographics.gender or 'unspecified'}); "
+        f"tone={profile.tone}; persona={profile.personalPreference or DEFAULT_PROFILE_PREFERENCE}; "
+        f"goals={profile.goals or 'none'}; cultures={', '.join(profile.cultures) or 'none'}; "
+        f"description={profile.description}\n"
+    )
+
+
+@dataclass
+class DeepExplainChunk:
+    delta: str | None = None
+    response: DeepExplainResponse | None = None
+
+
+@dataclass(frozen=True)
+class GenerationParams:
+    model: str
+    temperature: float
+    max_tokens: int
+    top_p: float | None = None
+
+
+def _generation_params(
+    config: ModelConfig | None,
+    fallback_model: str,
+    fallback_temperature: float,
+    fallback_max_tokens: int
+) -> GenerationParams:
+    if not config:
+        return GenerationParams(fallback_model, fallback_temperature, fallback_max_tokens)
+    return GenerationParams(
+        model=config.model or fallback_model,
+        temperature=fallback_temperature if config.temperature is None else config.temperature,
+        max_tokens=(
+            fallback_max_tokens
+            if (config.maxTokens is None or config.maxTokens <= 0)
+            else config.maxTokens
+        ),
+        top_p=config.topP
+    )
+
+
+@dataclass
+class DeepExplainJob:
+    request: ExplainRequest
+    knowledge_base: str
+    sources: list[SourceReference]
+
+
+def _retry_delay(attempt: int, response: httpx.Response | None) -> float:
+    # Honour a numeric Retry-After from a rate limit, otherwise back off with full jitter.
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)))
+
+
+def _check_output_language(request: ExplainRequest, lang_tag_raw: Any, primary_language: str) -> None:
+    lang_tag = _normalize_language_code(lang_tag_raw) or ((lang_tag_raw or '').strip().lower() or None)
+    primary_code = _normalize_language_code(primary_language) or primary_language.strip().lower()
+    if lang_tag and primary_code and lang_tag != primary_code:
+        logger.warning(
+            'Deep explain language mismatch: expected %s, got %s for request %s',
+            primary_code,
+            lang_tag,
+            request.requestId
+        )
+        raise RuntimeError(
+            f"Deep explain output language mismatch: expected '{primary_code}' but model returned '{lang_tag}'."
+        )
+
+
+def _raise_deep_failure(status_code: int, detail: str) -> None:
+    logger.warning('Deep explain request failed (%s): %s', status_code, detail)
+    raise RuntimeError(
+        f"OpenAI deep explain failed ({status_code}): {detail}"
+    )
+
+
+# Request-invariant structured-output formats, built once and shared by every
+# payload. Treat them as read-only.
+_QUICK_TEXT_FORMAT: Final[dict[str, Any]] = {
+    'format': {
+        'type': 'json_schema',
+        'name': 'json_schema',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'properties': {
+                'literal': {'type': 'string'},
+                'context': {'type': 'string'}
+            },
+            'required': ['literal', 'context'],
+            'additionalProperties': False
         }
     }
+}
 
 
-def _deep_text_format() -> dict[str, Any]:
-    return {
-        'format': {
-            'type': 'json_schema',
-            'name': 'deep_explain_schema',
-            'strict': True,
-            'schema': {
-                'type': 'object',
-                'additionalProperties': False,
-                'required': ['lang', 'background', 'crossCulture', 'confidence', 'reasoningNotes'],
-                'properties': {
-                    'lang': {
-                        'type': 'string',
-                        'pattern': '^[a-z]{2}(?:-[A-Z]{2})?$'
-                    },
-                    'background': {
-                        'type': 'object',
-                        'additionalProperties': False,
-                        'required': ['summary', 'detail', 'highlights'],
-                        'properties': {
-                            'summary': {'type': 'string'},
-                            'detail': {'type': ['string', 'null']},
-                            'highlights': {
-                                'type': 'array',
-                                'items': {'type': 'string'},
-                                'minItems': 0,
-                                'maxItems': 4
-                            }
-                        }
-                    },
-                    'crossCulture': {
-                        'type': 'array',
-                        'items': {
-                            'type': 'object',
-                            'additionalProperties': False,
-                            'required': [
-                                'profileId',
-                                'profileName',
-                                'headline',
-                                'analogy',
-                                'context',
-                                'notes',
-                                'confidence'
-                            ],
-                            'properties': {
-                                'profileId': {'type': 'string'},
-                                'profileName': {'type': 'string'},
-                                'headline': {'type': ['string', 'null']},
-                                'analogy': {'type': 'string'},
-                                'context': {'type': ['string', 'null']},
-                                'notes': {'type': ['string', 'null']},
-                                'confidence': {'type': 'string', 'enum': ['high', 'medium', 'low']}
-                            }
+_DEEP_TEXT_FORMAT: Final[dict[str, Any]] = {
+    'format': {
+        'type': 'json_schema',
+        'name': 'deep_explain_schema',
+        'strict': True,
+        'schema': {
+            'type': 'object',
+            'additionalProperties': False,
+            'required': ['lang', 'background', 'crossCulture', 'confidence', 'reasoningNotes'],
+            'properties': {
+                'lang': {
+                    'type': 'string',
+                    'pattern': '^[a-z]{2}(?:-[A-Z]{2})?$'
+                },
+                'background': {
+                    'type': 'object',
+                    'additionalProperties': False,
+                    'required': ['summary', 'detail', 'highlights'],
+                    'properties': {
+                        'summary': {'type': 'string'},
+                        'detail': {'type': ['string', 'null']},
+                        'highlights': {
+                            'type': 'array',
+                            'items': {'type': 'string'},
+                            'minItems': 0,
+                            'maxItems': 4
                         }
-                    },
-                    'confidence': {
+                    }
+                },
+                'crossCulture': {
+                    'type': 'array',
+                    'items': {
                         'type': 'object',
                         'additionalProperties': False,
-                        'required': ['level', 'notes'],
+                        'required': [
+                            'profileId',
+                            'profileName',
+                            'headline',
+                            'analogy',
+                            'context',
+                            'notes',
+                            'confidence'
+                        ],
                         'properties': {
-                            'level': {'type': 'string', 'enum': ['high', 'medium', 'low']},
-                            'notes': {'type': ['string', 'null']}
+                            'profileId': {'type': 'string'},
+                            'profileName': {'type': 'string'},
+                            'headline': {'type': ['string', 'null']},
+                            'analogy': {'type': 'string'},
+                            'context': {'type': ['string', 'null']},
+                            'notes': {'type': ['string', 'null']},
+                            'confidence': {'type': 'string', 'enum': ['high', 'medium', 'low']}
                         }
-                    },
-                    'reasoningNotes': {'type': ['string', 'null']}
-                }
+                    }
+                },
+                'confidence': {
+                    'type': 'object',
+                    'additionalProperties': False,
+                    'required': ['level', 'notes'],
+                    'properties': {
+                        'level': {'type': 'string', 'enum': ['high', 'medium', 'low']},
+                        'notes': {'type': ['string', 'null']}
+                    }
+                },
+                'reasoningNotes': {'type': ['string', 'null']}
             }
         }
     }
+}
+
+
+# Prompt caching only matches on an exact token prefix, so everything that
+# depends solely on the output language is rendered once here and placed ahead
+# of the per-request profile, knowledge and subtitle sections.
+@lru_cache(maxsize=64)
+def _quick_preamble(primary_language: str) -> str:
+    return (
+        'You are LinguaLens Quick Explain.\n'
+        f"Primary language: {primary_language}\n"
+        f"All output MUST be written in {primary_language}. This is the ONLY output language.\n"
+        "IGNORE any language hints from profiles, subtitles, knowledge base entries, or examples; they do NOT override the required output language.\n"
+        f"IMPORTANT: The literal field must be written entirely in {primary_language}; only quote other languages when repeating the original subtitle.\n"
+        f"IMPORTANT: The context field must be written entirely in {primary_language}. If you reference other languages, keep them in parentheses while the explanation remains in {primary_language}.\n"
+        "Before returning, re-read literal and context. If any portion is not natural in the primary language, translate or rewrite it until it is.\n"
+        f"If you cannot express an idea in {primary_language}, write the equivalent of 'translation unavailable' in {primary_language} instead of switching languages.\n"
+        'Return JSON with literal and context fields.\n'
+        f"literal: provide a natural translation into {primary_language}.\n"
+        f"context: explain intent or tone in {primary_language}, concise and friendly, tailored to the profile's background and goals.\n"
+    )
+
+
+@lru_cache(maxsize=64)
+def _deep_preamble(primary_language: str) -> str:
+    language = primary_language.upper()
+    return (
+        'You are LinguaLens Deep Explain.\n'
+        f"=== OUTPUT LANGUAGE: {language} ===\n"
+        f"CRITICAL: You MUST output ALL text in {language}. This is non-negotiable.\n"
+        f"If the user's profile says a different language, IGNORE IT. The primary language is {language}.\n"
+        '\n'
+        "=== CRITICAL OUTPUT LANGUAGE REQUIREMENT ===\n"
+        f"PRIMARY LANGUAGE: {language}\n"
+        f"ALL text output MUST be written EXCLUSIVELY in {language}.\n"
+        "This applies to EVERY field: background.summary, background.detail, background.highlights, crossCulture[].headline, crossCulture[].analogy, crossCulture[].context, crossCulture[].notes, confidence.notes, reasoningNotes.\n"
+        "IMPORTANT RULES:\n"
+        f"1. Write ALL explanations, summaries, and narratives in {language}.\n"
+        "2. NEVER use other languages (including Japanese, Chinese, Korean, etc.) for full sentences or explanations.\n"
+        f"3. At most, include a single quoted term in parentheses (e.g., '(idiom: break a leg)') while keeping the explanation in {language}.\n"
+        "4. IGNORE any language hints from profiles, knowledge base, or sources - they do NOT change the output language.\n"
+        f"5. If the knowledge base contains text in other languages, you MUST translate/paraphrase it into {language}.\n"
+        f"6. The 'lang' field in JSON MUST be set to exactly '{primary_language}' (not 'ja', 'zh', or any other code).\n"
+        "VERIFICATION STEP:\n"
+        f"Before returning JSON, re-read EVERY field. If ANY portion is not natural {language}, translate it immediately.\n"
+        f"If you cannot express something in {language}, use the {language} equivalent of 'not available' instead of switching languages.\n"
+        "=== END LANGUAGE REQUIREMENT ===\n"
+        'Return JSON with the following schema (no markdown fences, no prose outside the JSON object):\n'
+        '{\n'
+        f'  "lang": "{primary_language}" (MUST match the primary language exactly),\n'
+        '  "background": {\n'
+        f'    "summary": string (MUST be in {primary_language}),\n'
+        f'    "detail": string (optional, MUST be in {primary_language}),\n'
+        f'    "highlights": string[] (2-4 concise bullet insights, all in {primary_language})\n'
+        '  },\n'
+        '  "crossCulture": [\n'
+        '    {\n'
+        '      "profileId": string,\n'
+        '      "profileName": string,\n'
+        f'      "headline": string (short cultural hook, in {primary_language}),\n'
+        f'      "analogy": string (core explanation tailored to that culture, in {primary_language}),\n'
+        f'      "context": string (optional cultural nuance, in {primary_language}),\n'
+        f'      "notes": string (optional learning tip, in {primary_language}),\n'
+        '      "confidence": "high" | "medium" | "low"\n'
+        '    }\n'
+        '  ],\n'
+        f'  "confidence": {{ "level": "high" | "medium" | "low", "notes": string (optional, in {primary_language}) }},\n'
+        f'  "reasoningNotes": string (optional, in {primary_language})\n'
+        '}\n'
+        f'CRITICAL: Set "lang" field to "{primary_language}" - this is the ONLY acceptable value.\n'
+        'Guidance for personalization:\n'
+        '- Anchor the background summary to the primary profile\'s perspective, highlighting why the slang matters to them.\n'
+        '- For each crossCulture entry, weave in the listed profile\'s tone, cultural references, and personal goals so the analogy feels bespoke.\n'
+        '- CRITICAL: For each profile, use their specific culture tags (listed in "cultures" field) to create analogies. If a profile has cultures="US,UK", draw comparisons to US and UK cultural references that person would understand.\n'
+        '- Make analogies culture-specific: reference movies, idioms, social norms, or everyday scenarios from EACH profile\'s listed cultures.\n'
+        '- When offering notes, include practical tips or comparisons tied to each profile\'s region or daily experiences.\n'
+        'Personalization directives:\n'
+        '1. Keep the narrative clear and supportive, mirroring the requested tone.\n'
+        '2. If cultural nuance is ambiguous, clarify it with comparisons familiar to the listed profiles.\n'
+        '3. CRITICAL CULTURE TAGS: Each profile lists specific cultures (e.g., "US, UK", "CN", "JP"). Use THOSE exact cultures for analogies and references.\n'
+        '4. For crossCulture entries: Draw parallels to movies, idioms, social norms, or daily scenarios from EACH profile\'s listed culture tags.\n'
+        '5. Example: If profile has cultures="US,UK", reference American/British pop culture, sports, or workplace norms they would recognize.\n'
+    )
+
+
+def _leased(method: Callable[..., Any]) -> Callable[..., Any]:
+    """Count the call as in flight so an evicted client is not closed under it."""
+    @wraps(method)
+    async def wrapper(self: 'OpenAIClient', *args: Any, **kwargs: Any) -> Any:
+        self._leases += 1
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            self._release()
+
+    return wrapper
 
 
 class OpenAIClient:
@@ -213,10 +492,27 @@ class OpenAIClient:
         normalized_base = base_url.rstrip('/') if base_url and base_url.endswith('/') else base_url
         if not normalized_base:
             normalized_base = 'https://api.openai.com/v1'
-        self._client = httpx.AsyncClient(base_url=normalized_base, timeout=15.0)
+        # The key is fixed per pooled client, so it rides along as a default header.
+        self._client = httpx.AsyncClient(
+            base_url=normalized_base,
+            timeout=httpx.Timeout(15.0, connect=3.0),
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=60),
+            http2=True,
+            headers={'Authorization': f'Bearer {api_key}'}
+        )
         self._api_key = api_key
-        self._model_config = model_config
         self._base_url = normalized_base
+        settings = get_settings()
+        self._model_quick = settings.openai_model_quick
+        self._model_deep = settings.openai_model_deep
+        self._quick_ttl = settings.quick_cache_ttl
+        self._quick_ttl_ms = settings.quick_cache_ttl * 1000
+        self._quick_memo: OrderedDict[str, tuple[float, QuickExplainResponse]] = OrderedDict()
+        self.model_config = model_config
+        self._quick_inflight: dict[str, asyncio.Task[QuickExplainResponse]] = {}
+        self._batch_semaphore = asyncio.Semaphore(QUICK_BATCH_CONCURRENCY)
+        self._leases = 0
+        self._retired = False
 
     @classmethod
     async def create(
@@ -224,8 +520,7 @@ class OpenAIClient:
         api_key: str | None = None,
         base_url: str | None = None
     ) -> 'OpenAIClient':
-        settings = get_settings()
-        store = await ModelStore.create()
+        store = await get_model_store()
         default_model = await store.get_default()
 
         key = (api_key or '').strip()
@@ -237,168 +532,362 @@ class OpenAIClient:
             if not base and default_model.baseUrl:
                 base = default_model.baseUrl.strip()
 
-        if not key:
-            key = (settings.openai_api_key or '').strip()
-        if not base:
-            base = settings.openai_base_url.strip() if settings.openai_base_url else ''
+        # Server settings are only the fallback behind request headers and the default model.
+        if not key or not base:
+            settings = get_settings()
+            if not key:
+                key = (settings.openai_api_key or '').strip()
+            if not base:
+                base = settings.openai_base_url.strip() if settings.openai_base_url else ''
         if not key:
             raise RuntimeError('OpenAI API key is not configured on the server.')
 
-        return cls(base, key, model_config=default_model)
-
-    def _resolve_generation_params(
+        cache_key = (key, base)
+        async with _clients_lock:
+            client = _clients.get(cache_key)
+            if client is None:
+                client = cls(base, key, model_config=default_model)
+                _clients[cache_key] = client
+                if len(_clients) > MAX_CACHED_CLIENTS:
+                    _, evicted = _clients.popitem(last=False)
+                    evicted._retire()
+            else:
+                _clients.move_to_end(cache_key)
+                # The model store hands out the same instance until the default
+                # changes, so params are only re-resolved after an edit.
+                if client._model_config is not default_model:
+                    client.model_config = default_model
+        return client
+
+    @property
+    def model_config(self) -> ModelConfig | None:
+        return self._model_config
+
+    @model_config.setter
+    def model_config(self, config: ModelConfig | None) -> None:
+        self._model_config = config
+        self._quick_params = _generation_params(config, self._model_quick, 0.3, 512)
+        self._deep_params = _generation_params(config, self._model_deep, 0.4, 720)
+        # Memoised answers came from the previous model and sampling settings.
+        self._quick_memo.clear()
+
+    @_leased
+    async def quick_explain(self, request: ExplainRequest) -> QuickExplainResponse:
+        # Rewinding a video replays the same line; answer those from memory and
+        # let concurrent duplicates share a single upstream call.
+        key = _quick_memo_key(request)
+        memo = self._quick_memo.get(key)
+        if memo is not None and memo[0] > time():
+            self._quick_memo.move_to_end(key)
+            response = memo[1]
+        else:
+            task = self._quick_inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(self._fetch_quick(request, key))
+                self._quick_inflight[key] = task
+                task.add_done_callback(lambda _: self._quick_inflight.pop(key, None))
+            response = await asyncio.shield(task)
+        if response.requestId != request.requestId:
+            response = response.model_copy(update={'requestId': request.requestId})
+        return response
+
+    async def quick_explain_batch(
         self,
-        fallback_model: str,
-        fallback_temperature: float,
-        fallback_max_tokens: int
-    ) -> tuple[str, float, int, float | None]:
-        config = self._model_config
-        if not config:
-            return fallback_model, fallback_temperature, fallback_max_tokens, None
-        model_name = config.model or fallback_model
-        temperature = (
-            fallback_temperature
-            if config.temperature is None
-            else config.temperature
-        )
-        max_tokens = (
-            fallback_max_tokens
-            if (config.maxTokens is None or config.maxTokens <= 0)
-            else config.maxTokens
-        )
-        top_p = config.topP
-        return model_name, temperature, max_tokens, top_p
+        requests: list[ExplainRequest]
+    ) -> list[QuickExplainResponse | BaseException]:
+        """Resolve many quick explains concurrently; failures are returned in place."""
+        async def bounded(request: ExplainRequest) -> QuickExplainResponse:
+            async with self._batch_semaphore:
+                return await self.quick_explain(request)
 
-    async def quick_explain(self, request: ExplainRequest) -> QuickExplainResponse:
-        settings = get_settings()
+        return await asyncio.gather(*(bounded(request) for request in requests), return_exceptions=True)
+
+    async def deep_explain_many(
+        self,
+        jobs: list[DeepExplainJob]
+    ) -> list[DeepExplainResponse | BaseException]:
+        """Run several deep explains concurrently; failures are returned in place."""
+        async def bounded(job: DeepExplainJob) -> DeepExplainResponse:
+            async with self._batch_semaphore:
+                return await self.deep_explain(job.request, job.knowledge_base, job.sources)
+
+        return await asyncio.gather(*(bounded(job) for job in jobs), return_exceptions=True)
+
+    @_leased
+    async def _fetch_quick(self, request: ExplainRequest, key: str) -> QuickExplainResponse:
+        response = await self._request_quick(request)
+        self._quick_memo[key] = (time() + self._quick_ttl, response)
+        if len(self._quick_memo) > QUICK_MEMO_SIZE:
+            self._quick_memo.popitem(last=False)
+        return response
+
+    async def _request_quick(self, request: ExplainRequest) -> QuickExplainResponse:
         primary_language = _effective_primary_language(request)
-        model_name, temperature, max_tokens, top_p = self._resolve_generation_params(
-            settings.openai_model_quick,
-            0.3,
-            512,
-        )
+        params = self._quick_params
         payload = {
-            'model': model_name,
-            'input': self._build_prompt(request),
-            'temperature': temperature,
-            'max_output_tokens': max_tokens,
-            'text': _quick_text_format()
+            'model': params.model,
+            'input': self._build_prompt(request, primary_language),
+            'temperature': params.temperature,
+            'max_output_tokens': params.max_tokens,
+            'text': _QUICK_TEXT_FORMAT
         }
-        if top_p is not None:
-            payload['top_p'] = top_p
-        print('[LinguaLens][Server] 准备请求快速解释', {
-            '请求编号': request.requestId,
-            '模型': payload['model'],
-            '提示词前120字符': payload['input'][:120],
-            '最大输出token': payload['max_output_tokens'],
-            '温度': payload['temperature'],
-            'Top P': payload.get('top_p')
-        })
-        response = await self._client.post(
-            '/responses',
-            headers={'Authorization': f'Bearer {self._api_key}'},
-            json=payload
+        if params.top_p is not None:
+            payload['top_p'] = params.top_p
+        logger.debug(
+            'Quick explain request %s: model=%s temperature=%s max_output_tokens=%s top_p=%s prompt=%.120r',
+            request.requestId,
+            params.model,
+            params.temperature,
+            params.max_tokens,
+            params.top_p,
+            payload['input']
         )
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            detail = exc.response.text
-            logger.warning('Quick explain request failed: %s', detail)
-            print('[LinguaLens][Server] 快速解释请求失败', {
-                '状态码': exc.response.status_code,
-                '响应内容': detail
-            })
+        response = await self._post_responses(orjson.dumps(payload))
+        if not response.is_success:
+            detail = response.text
+            logger.warning('Quick explain request failed (%s): %s', response.status_code, detail)
             raise RuntimeError(
-                f"OpenAI quick explain failed ({exc.response.status_code}): {detail}"
-            ) from exc
-        data = response.json()
-        print('[LinguaLens][Server] 快速解释原始响应', {
-            '请求编号': request.requestId,
-            '响应预览': str(data)[:200]
-        })
+                f"OpenAI quick explain failed ({response.status_code}): {detail}"
+            )
+        data = orjson.loads(response.content)
+        logger.debug('Quick explain response for %s: %d bytes', request.requestId, len(response.content))
         text = parse_output_text(data)
         literal, context = split_quick_output(text)
-        ttl_ms = get_settings().quick_cache_ttl * 1000
-        now_ms = int(time() * 1000)
+        now_ms = time_ns() // 1_000_000
         return QuickExplainResponse(
             requestId=request.requestId,
             literal=literal,
             context=context,
             languages=LanguagePair(primary=primary_language, secondary=None),
             detectedAt=now_ms,
-            expiresAt=now_ms + ttl_ms
+            expiresAt=now_ms + self._quick_ttl_ms
         )
 
+    async def _post_responses(self, body: bytes) -> httpx.Response:
+        """POST to /responses, retrying rate limits, transient 5xx and transport errors."""
+        attempt = 1
+        while True:
+            try:
+                response = await self._client.post('/responses', content=body, headers=_JSON_HEADERS)
+            except httpx.TransportError as exc:
+                if attempt >= RETRY_ATTEMPTS:
+                    raise
+                delay = _retry_delay(attempt, None)
+                logger.warning('Responses call failed (%s); retrying in %.2fs', exc, delay)
+            else:
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= RETRY_ATTEMPTS:
+                    return response
+                delay = _retry_delay(attempt, response)
+                logger.warning('Responses call returned %s; retrying in %.2fs', response.status_code, delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @_leased
     async def deep_explain(
         self,
         request: ExplainRequest,
         knowledge_base: str,
         sources: list[SourceReference]
     ) -> DeepExplainResponse:
-        settings = get_settings()
         primary_language = _effective_primary_language(request)
-        print(f'[LinguaLens] Deep explain 使用的输出语言: {primary_language}')
-        model_name, temperature, max_tokens, top_p = self._resolve_generation_params(
-            settings.openai_model_deep,
-            0.4,
-            720,
+        payload = self._build_deep_payload(request, knowledge_base, sources, primary_language)
+        response = await self._post_responses(orjson.dumps(payload))
+        if not response.is_success:
+            _raise_deep_failure(response.status_code, response.text)
+        raw_json = orjson.loads(response.content)
+        logger.debug('Deep explain response for %s: %d bytes', request.requestId, len(response.content))
+        text = parse_output_text(raw_json)
+        return self._finalize_deep(request, text, sources, primary_language)
+
+    async def deep_explain_stream(
+        self,
+        request: ExplainRequest,
+        knowledge_base: str,
+        sources: list[SourceReference]
+    ) -> AsyncIterator[DeepExplainChunk]:
+        """Yield output text deltas as the model produces them, then the parsed response."""
+        self._leases += 1
+        try:
+            primary_language = _effective_primary_language(request)
+            payload = self._build_deep_payload(request, knowledge_base, sources, primary_language)
+            payload['stream'] = True
+            parts: list[str] = []
+            completed: dict[str, Any] | None = None
+            # Until the lang field has been seen, keep probing the streamed prefix so a
+            # wrong-language answer is cancelled before the rest of it is generated.
+            probing = True
+            streamed = 0
+            async with self._client.stream(
+                'POST', '/responses', content=orjson.dumps(payload), headers=_JSON_HEADERS
+            ) as response:
+                if response.is_error:
+                    detail = (await response.aread()).decode('utf-8', errors='replace')
+                    _raise_deep_failure(response.status_code, detail)
+                async for line in response.aiter_lines():
+                    if not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if not data or data == '[DONE]':
+                        continue
+                    event = orjson.loads(data)
+                    event_type = event.get('type')
+                    if event_type == 'response.output_text.delta':
+                        delta = event.get('delta') or ''
+                        if delta:
+                            parts.append(delta)
+                            if probing:
+                                streamed += len(delta)
+                                match = _LANG_FIELD_RE.search(''.join(parts))
+                                if match:
+                                    probing = False
+                                    _check_output_language(request, match.group(1), primary_language)
+                                elif streamed > LANG_PROBE_CHARS:
+                                    probing = False
+                            yield DeepExplainChunk(delta=delta)
+                    elif event_type == 'response.completed':
+                        completed = event.get('response')
+                    elif event_type in {'response.failed', 'error'}:
+                        error = event.get('error') or (event.get('response') or {}).get('error') or event
+                        _raise_deep_failure(response.status_code, orjson.dumps(error).decode())
+            text = ''.join(parts) or parse_output_text(completed)
+            yield DeepExplainChunk(response=self._finalize_deep(request, text, sources, primary_language))
+        finally:
+            self._release()
+
+    @_leased
+    async def deep_explain_batch_submit(self, jobs: list[DeepExplainJob]) -> str:
+        """Queue deep explains on the Batch API (24h window, half price) and return the batch id.
+
+        Each job's requestId is used as the batch custom_id, so it must be unique within the batch.
+        """
+        lines = b'\n'.join(
+            orjson.dumps({
+                'custom_id': job.request.requestId,
+                'method': 'POST',
+                'url': '/v1/responses',
+                'body': self._build_deep_payload(job.request, job.knowledge_base, job.sources)
+            })
+            for job in jobs
         )
+        upload = await self._client.post(
+            '/files',
+            data={'purpose': 'batch'},
+            files={'file': ('deep-explain.jsonl', lines, 'application/jsonl')}
+        )
+        if upload.is_error:
+            _raise_deep_failure(upload.status_code, upload.text)
+        batch = await self._client.post('/batches', content=orjson.dumps({
+            'input_file_id': orjson.loads(upload.content)['id'],
+            'endpoint': '/v1/responses',
+            'completion_window': '24h'
+        }), headers=_JSON_HEADERS)
+        if batch.is_error:
+            _raise_deep_failure(batch.status_code, batch.text)
+        return orjson.loads(batch.content)['id']
+
+    @_leased
+    async def deep_explain_batch(self, jobs: list[DeepExplainJob]) -> list[DeepExplainResponse | BaseException]:
+        """Submit jobs to the Batch API and wait for the results, polling with exponential backoff.
+
+        Meant for background work such as re-enrichment or backfills; interactive
+        requests should keep using deep_explain.
+        """
+        batch_id = await self.deep_explain_batch_submit(jobs)
+        delay = BATCH_POLL_INITIAL_SECONDS
+        while True:
+            results = await self.deep_explain_batch_fetch(batch_id, jobs)
+            if results is not None:
+                return results
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+
+    @_leased
+    async def deep_explain_batch_fetch(
+        self,
+        batch_id: str,
+        jobs: list[DeepExplainJob]
+    ) -> list[DeepExplainResponse | BaseException] | None:
+        """Return results in job order once the batch has completed, or None while it is still running."""
+        status = await self._client.get(f'/batches/{batch_id}')
+        if status.is_error:
+            _raise_deep_failure(status.status_code, status.text)
+        batch = orjson.loads(status.content)
+        state = batch.get('status')
+        if state in {'failed', 'expired', 'cancelled'}:
+            raise RuntimeError(f'OpenAI deep explain batch {batch_id} ended as {state}.')
+        if state != 'completed':
+            return None
+
+        items: dict[str, dict[str, Any]] = {}
+        if batch.get('output_file_id'):
+            output = await self._client.get(f"/files/{batch['output_file_id']}/content")
+            if output.is_error:
+                _raise_deep_failure(output.status_code, output.text)
+            for line in output.content.splitlines():
+                if line.strip():
+                    item = orjson.loads(line)
+                    items[item.get('custom_id')] = item
+
+        results: list[DeepExplainResponse | BaseException] = []
+        for job in jobs:
+            item = items.get(job.request.requestId) or {}
+            response = item.get('response') or {}
+            if response.get('status_code') != 200:
+                results.append(RuntimeError(
+                    f"OpenAI deep explain batch item {job.request.requestId} failed: "
+                    f"{item.get('error') or response.get('body') or 'no result'}"
+                ))
+                continue
+            try:
+                text = parse_output_text(response.get('body'))
+                results.append(self._finalize_deep(job.request, text, job.sources))
+            except Exception as exc:
+                results.append(exc)
+        return results
+
+    def _build_deep_payload(
+        self,
+        request: ExplainRequest,
+        knowledge_base: str,
+        sources: list[SourceReference],
+        primary_language: str | None = None
+    ) -> dict[str, Any]:
+        # Callers that also finalize the response resolve the language once and pass it in.
+        primary_language = primary_language or _effective_primary_language(request)
+        params = self._deep_params
         payload = {
-            'model': model_name,
-            'input': self._build_deep_prompt(request, knowledge_base, sources),
-            'temperature': temperature,
-            'max_output_tokens': max_tokens,
-            'text': _deep_text_format()
+            'model': params.model,
+            'input': self._build_deep_prompt(request, knowledge_base, sources, primary_language),
+            'temperature': params.temperature,
+            'max_output_tokens': params.max_tokens,
+            'text': _DEEP_TEXT_FORMAT
         }
-        if top_p is not None:
-            payload['top_p'] = top_p
-        print('[LinguaLens][Server] 准备请求深度解释', {
-            '请求编号': request.requestId,
-            '模型': payload['model'],
-            '提示词前120字符': payload['input'][:120],
-            '最大输出token': payload['max_output_tokens'],
-            '温度': payload['temperature'],
-            'Top P': payload.get('top_p'),
-            '知识库预览': knowledge_base[:120]
-        })
-        response = await self._client.post(
-            '/responses',
-            headers={'Authorization': f'Bearer {self._api_key}'},
-            json=payload
+        if params.top_p is not None:
+            payload['top_p'] = params.top_p
+        logger.debug(
+            'Deep explain request %s: language=%s model=%s temperature=%s max_output_tokens=%s top_p=%s '
+            'prompt=%.120r knowledge_base=%.120r',
+            request.requestId,
+            primary_language,
+            params.model,
+            params.temperature,
+            params.max_tokens,
+            params.top_p,
+            payload['input'],
+            knowledge_base
         )
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            detail = exc.response.text
-            logger.warning('Deep explain request failed: %s', detail)
-            print('[LinguaLens][Server] 深度解释请求失败', {
-                '状态码': exc.response.status_code,
-                '响应内容': detail
-            })
-            raise RuntimeError(
-                f"OpenAI deep explain failed ({exc.response.status_code}): {detail}"
-            ) from exc
-        raw_json = response.json()
-        print('[LinguaLens][Server] 深度解释原始响应', {
-            '请求编号': request.requestId,
-            '响应预览': str(raw_json)[:200]
-        })
-        text = parse_output_text(raw_json)
+        return payload
+
+    def _finalize_deep(
+        self,
+        request: ExplainRequest,
+        text: str,
+        sources: list[SourceReference],
+        primary_language: str | None = None
+    ) -> DeepExplainResponse:
         result = parse_deep_response(text)
-        lang_tag_raw = result.get('lang')
-        lang_tag = _normalize_language_code(lang_tag_raw) or ((lang_tag_raw or '').strip().lower() or None)
-        primary_language = _effective_primary_language(request)
-        primary_code = _normalize_language_code(primary_language) or primary_language.strip().lower()
-        if lang_tag and primary_code and lang_tag != primary_code:
-            logger.warning(
-                'Deep explain language mismatch: expected %s, got %s for request %s',
-                primary_code,
-                lang_tag,
-                request.requestId
-            )
-            raise RuntimeError(
-                f"Deep explain output language mismatch: expected '{primary_code}' but model returned '{lang_tag}'."
-            )
+        primary_language = primary_language or _effective_primary_language(request)
+        _check_output_language(request, result.get('lang'), primary_language)
         return DeepExplainResponse(
             requestId=request.requestId,
             background=result['background'],
@@ -407,206 +896,159 @@ class OpenAIClient:
             confidence=result['confidence'],
             reasoningNotes=result.get('reasoningNotes'),
             profileId=request.profileId,
-            generatedAt=int(time() * 1000),
+            generatedAt=time_ns() // 1_000_000,
             language=result.get('lang')
         )
 
-    async def close(self) -> None:
+    async def aclose(self) -> None:
+        # Pooled clients are shared between requests; only close_clients() and
+        # pool eviction should call this.
         await self._client.aclose()
 
-    def _build_prompt(self, request: ExplainRequest) -> str:
-        primary_language = _effective_primary_language(request)
-        profile_lines: list[str] = []
+    def _retire(self) -> None:
+        # Evicted from the pool: close once the calls already using it finish.
+        self._retired = True
+        if not self._leases:
+            _close_in_background(self)
+
+    def _release(self) -> None:
+        self._leases -= 1
+        if self._retired and not self._leases:
+            _close_in_background(self)
+
+    def _build_prompt(self, request: ExplainRequest, primary_language: str | None = None) -> str:
+        primary_language = primary_language or _effective_primary_language(request)
         if request.profile:
-            demographics = request.profile.demographics
-            profile_lines = [
-                f"User profile: {request.profile.name} (id: {request.profile.id})",
-                f"Profile locale: {demographics.region}",
-                f"Cultural focus: {', '.join(request.profile.cultures) or 'none'}",
-                f"Demographics: age_range={demographics.ageRange}, region={demographics.region}, occupation={demographics.occupation}, gender={demographics.gender or 'unspecified'}",
-                f"Tone preference: {request.profile.tone}",
-                f"Personal preference: {request.profile.personalPreference or DEFAULT_PROFILE_PREFERENCE}",
-                f"Learning goals: {request.profile.goals or 'none specified'}",
-                f"Description: {request.profile.description}",
-                f"Adjust literal/context to resonate with {request.profile.name} while staying accurate and concise.",
-                f"Use examples tied to {', '.join(request.profile.cultures) or 'their cultural background'} and relatable situations in {demographics.region}.",
-                f"Keep explanations aligned with the desired tone ({request.profile.tone}) and highlight implications relevant to {request.profile.goals or 'their learning goals'}."
-            ]
-        lines = [
-            'You are LinguaLens Quick Explain.',
-            f"Primary language: {primary_language}",
-            f"All output MUST be written in {primary_language}. This is the ONLY output language.",
-            "IGNORE any language hints from profiles, subtitles, knowledge base entries, or examples; they do NOT override the required output language.",
-            f"IMPORTANT: The literal field must be written entirely in {primary_language}; only quote other languages when repeating the original subtitle.",
-            f"IMPORTANT: The context field must be written entirely in {primary_language}. If you reference other languages, keep them in parentheses while the explanation remains in {primary_language}.",
-            "Before returning, re-read literal and context. If any portion is not natural in the primary language, translate or rewrite it until it is.",
-            f"If you cannot express an idea in {primary_language}, write the equivalent of 'translation unavailable' in {primary_language} instead of switching languages.",
-            f"Subtitle: {request.subtitleText}",
-            f"Context: {request.surrounding or 'n/a'}",
-            'Return JSON with literal and context fields.',
-            f"literal: provide a natural translation into {primary_language}.",
-            f"context: explain intent or tone in {primary_language}, concise and friendly, tailored to the profile's background and goals.",
-            *profile_lines,
-            (
-                'When cultural nuance or slang appears, compare it to a concept familiar to the profile.'
-                if request.profile
-                else 'When cultural nuance or slang appears, compare it to a widely understood concept.'
+            profile = request.profile
+            profile_block = _profile_text(
+                ('quick', _profile_digest(profile)),
+                lambda: _render_quick_profile(profile)
             )
-        ]
-        return '\n'.join(line for line in lines if line)
+        else:
+            profile_block = 'When cultural nuance or slang appears, compare it to a widely understood concept.\n'
+        return (
+            f"{_quick_preamble(primary_language)}"
+            f"{profile_block}"
+            f"Subtitle: {request.subtitleText}\n"
+            f"Context: {request.surrounding or 'n/a'}"
+        )
 
     def _build_deep_prompt(
         self,
         request: ExplainRequest,
         knowledge_base: str,
-        sources: list[SourceReference]
+        sources: list[SourceReference],
+        primary_language: str | None = None
     ) -> str:
-        primary_language = _effective_primary_language(request)
+        primary_language = primary_language or _effective_primary_language(request)
         sources_text = '\n'.join(
             [f"- {source.title}: {source.excerpt} (credibility: {source.credibility})" for source in sources]
         )
         variant_profiles: list = []
+        seen_ids: set[str] = set()
         if request.profile:
             variant_profiles.append(request.profile)
-        if request.profiles:
-            for profile in request.profiles:
-                if not any(existing.id == profile.id for existing in variant_profiles):
-                    variant_profiles.append(profile)
-        profile_sections: list[str] = []
-        for profile in variant_profiles:
-            demographics = profile.demographics
-            profile_sections.append(
-                f"- {profile.id}: {profile.name}; demographics(age_range={demographics.ageRange}, region={demographics.region}, occupation={demographics.occupation}, gender={demographics.gender or 'unspecified'}); tone={profile.tone}; persona={profile.personalPreference or DEFAULT_PROFILE_PREFERENCE}; goals={profile.goals or 'none'}; cultures={', '.join(profile.cultures) or 'none'}; description={profile.description}"
-            )
-        schema_instructions = [
-            'Return JSON with the following schema (no markdown fences, no prose outside the JSON object):',
-            '{',
-            f'  "lang": "{primary_language}" (MUST match the primary language exactly),',
-            '  "background": {',
-            f'    "summary": string (MUST be in {primary_language}),',
-            f'    "detail": string (optional, MUST be in {primary_language}),',
-            f'    "highlights": string[] (2-4 concise bullet insights, all in {primary_language})',
-            '  },',
-            '  "crossCulture": [',
-            '    {',
-            '      "profileId": string,',
-            '      "profileName": string,',
-            f'      "headline": string (short cultural hook, in {primary_language}),',
-            f'      "analogy": string (core explanation tailored to that culture, in {primary_language}),',
-            f'      "context": string (optional cultural nuance, in {primary_language}),',
-            f'      "notes": string (optional learning tip, in {primary_language}),',
-            '      "confidence": "high" | "medium" | "low"',
-            '    }',
-            '  ],',
-            f'  "confidence": {{ "level": "high" | "medium" | "low", "notes": string (optional, in {primary_language}) }},',
-            f'  "reasoningNotes": string (optional, in {primary_language})',
-            '}',
-            f'CRITICAL: Set "lang" field to "{primary_language}" - this is the ONLY acceptable value.'
-        ]
-
-        schema_instructions.extend(
-            [
-                'Guidance for personalization:',
-                '- Anchor the background summary to the primary profile\'s perspective, highlighting why the slang matters to them.',
-                '- For each crossCulture entry, weave in the listed profile\'s tone, cultural references, and personal goals so the analogy feels bespoke.',
-                f'- CRITICAL: For each profile, use their specific culture tags (listed in "cultures" field) to create analogies. If a profile has cultures="US,UK", draw comparisons to US and UK cultural references that person would understand.',
-                '- Make analogies culture-specific: reference movies, idioms, social norms, or everyday scenarios from EACH profile\'s listed cultures.',
-                '- When offering notes, include practical tips or comparisons tied to each profile\'s region or daily experiences.'
-            ]
+            seen_ids.add(request.profile.id)
+        for profile in request.profiles or ():
+            if profile.id not in seen_ids:
+                seen_ids.add(profile.id)
+                variant_profiles.append(profile)
+        # Each optional line carries its own trailing newline so the template
+        # below can interpolate empty sections without leaving blank lines. The
+        # profile block is keyed on the whole ordered set, so a hit skips the loop.
+        profile_sections = _profile_text(
+            ('deep', *(_profile_digest(profile) for profile in variant_profiles)),
+            lambda: ''.join(_render_variant_profile(profile) for profile in variant_profiles)
         )
-
-        personalization_guidelines: list[str] = [
-            'Personalization directives:',
-            '1. Keep the narrative clear and supportive, mirroring the requested tone.',
-            '2. If cultural nuance is ambiguous, clarify it with comparisons familiar to the listed profiles.',
-            '3. CRITICAL CULTURE TAGS: Each profile lists specific cultures (e.g., "US, UK", "CN", "JP"). Use THOSE exact cultures for analogies and references.',
-            '4. For crossCulture entries: Draw parallels to movies, idioms, social norms, or daily scenarios from EACH profile\'s listed culture tags.',
-            '5. Example: If profile has cultures="US,UK", reference American/British pop culture, sports, or workplace norms they would recognize.'
-        ]
-
+        extra_guidelines = ''
         if request.profile:
-            demographics = request.profile.demographics
-            personalization_guidelines.append(
-                f"6. Emphasize takeaways that help {request.profile.name} ({demographics.region}) understand emotional subtext or etiquette around the slang."
+            extra_guidelines += (
+                f"6. Emphasize takeaways that help {request.profile.name} ({request.profile.demographics.region}) understand emotional subtext or etiquette around the slang.\n"
             )
         if len(variant_profiles) > 1:
-            personalization_guidelines.append(
-                "7. Make crossCulture entries distinct—avoid repeating examples between profiles; address each persona's unique background."
+            extra_guidelines += (
+                "7. Make crossCulture entries distinct—avoid repeating examples between profiles; address each persona's unique background.\n"
             )
 
-        language_instructions = [
-            f"=== CRITICAL OUTPUT LANGUAGE REQUIREMENT ===",
-            f"PRIMARY LANGUAGE: {primary_language.upper()}",
-            f"ALL text output MUST be written EXCLUSIVELY in {primary_language.upper()}.",
-            f"This applies to EVERY field: background.summary, background.detail, background.highlights, crossCulture[].headline, crossCulture[].analogy, crossCulture[].context, crossCulture[].notes, confidence.notes, reasoningNotes.",
-            f"",
-            f"IMPORTANT RULES:",
-            f"1. Write ALL explanations, summaries, and narratives in {primary_language.upper()}.",
-            f"2. NEVER use other languages (including Japanese, Chinese, Korean, etc.) for full sentences or explanations.",
-            f"3. At most, include a single quoted term in parentheses (e.g., '(idiom: break a leg)') while keeping the explanation in {primary_language.upper()}.",
-            f"4. IGNORE any language hints from profiles, knowledge base, or sources - they do NOT change the output language.",
-            f"5. If the knowledge base contains text in other languages, you MUST translate/paraphrase it into {primary_language.upper()}.",
-            f"6. The 'lang' field in JSON MUST be set to exactly '{primary_language}' (not 'ja', 'zh', or any other code).",
-            f"",
-            f"VERIFICATION STEP:",
-            f"Before returning JSON, re-read EVERY field. If ANY portion is not natural {primary_language.upper()}, translate it immediately.",
-            f"If you cannot express something in {primary_language.upper()}, use the {primary_language.upper()} equivalent of 'not available' instead of switching languages.",
-            f"=== END LANGUAGE REQUIREMENT ===",
-        ]
+        return (
+            f"{_deep_preamble(primary_language)}"
+            'Profiles to address (return crossCulture entries for each profileId in the list):\n'
+            f"{profile_sections}"
+            f"{extra_guidelines}"
+            'Knowledge base snippets:\n'
+            f"{knowledge_base}\n"
+            f'Translate and paraphrase any knowledge base or source content into {primary_language.upper()}. Do NOT include long verbatim quotes in other languages.\n'
+            'Sources:\n'
+            f"{sources_text}\n"
+            f"Subtitle: {request.subtitleText}\n"
+            f"Context: {request.surrounding or 'n/a'}"
+        )
 
-        lines = [
-            'You are LinguaLens Deep Explain.',
-            f"=== OUTPUT LANGUAGE: {primary_language.upper()} ===",
-            f"CRITICAL: You MUST output ALL text in {primary_language.upper()}. This is non-negotiable.",
-            f"If the user's profile says a different language, IGNORE IT. The primary language is {primary_language.upper()}.",
-            '',
-            *[item for item in language_instructions if item],
-            f"Subtitle: {request.subtitleText}",
-            f"Context: {request.surrounding or 'n/a'}",
-            'Profiles to address (return crossCulture entries for each profileId in the list):',
-            *profile_sections,
-            'Knowledge base snippets:',
-            knowledge_base,
-            f'Translate and paraphrase any knowledge base or source content into {primary_language.upper()}. Do NOT include long verbatim quotes in other languages.',
-            'Sources:',
-            sources_text,
-            *personalization_guidelines,
-            *schema_instructions
-        ]
-        return '\n'.join(lines)
+
+_clients: OrderedDict[tuple[str, str], OpenAIClient] = OrderedDict()
+_clients_lock = asyncio.Lock()
+
+
+_closing: set[asyncio.Task] = set()
+
+
+def _close_in_background(client: OpenAIClient) -> None:
+    task = asyncio.create_task(client.aclose())
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+
+async def close_clients() -> None:
+    async with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        await client.aclose()
+    await asyncio.gather(*_closing, return_exceptions=True)
 
 
 def parse_output_text(payload: Any) -> str:
-    if not isinstance(payload, dict):
+    # Payloads come straight from orjson, so exact type checks are safe here.
+    if type(payload) is not dict:
         return payload if isinstance(payload, str) else ''
+    get = payload.get
 
-    json_value = payload.get('output_json') or payload.get('json')
+    # Fast path: the usual Responses payload carries the whole answer as a string.
+    output = get('output_text')
+    if type(output) is str:
+        return output
+
+    json_value = get('output_json') or get('json')
     json_text = _stringify_json(json_value)
     if json_text:
         return json_text
 
-    output = payload.get('output_text')
     if isinstance(output, list):
         return '\n'.join(_stringify_part(part) for part in output if part)
-    if isinstance(output, str):
-        return output
 
-    rich_output = payload.get('output')
+    rich_output = get('output')
     if isinstance(rich_output, list):
         for item in rich_output:
             if not isinstance(item, dict):
                 continue
             content = item.get('content')
+            # A message whose first part is output_text is the shape the API
+            # returns without output_text, so read it before the generic walk.
+            if type(content) is list and content:
+                first = content[0]
+                if type(first) is dict and first.get('type') == 'output_text':
+                    text = first.get('text')
+                    if type(text) is str and text:
+                        return text
             extracted = _extract_from_content(content)
             if extracted:
                 return extracted
 
-    content = payload.get('content')
-    extracted = _extract_from_content(content)
+    extracted = _extract_from_content(get('content'))
     if extracted:
         return extracted
 
-    choices = payload.get('choices')
+    choices = get('choices')
     if isinstance(choices, list):
         for choice in choices:
             if not isinstance(choice, dict):
@@ -626,47 +1068,42 @@ def parse_output_text(payload: Any) -> str:
 
 
 def _extract_from_content(content: Any) -> str | None:
-    if isinstance(content, str):
-        return content
-    if isinstance(content, list):
-        for piece in content:
-            extracted = _extract_from_piece(piece)
-            if extracted:
-                return extracted
-        return None
-    if isinstance(content, dict):
-        return _extract_from_piece(content)
-    return None
-
-
-def _extract_from_piece(piece: Any) -> str | None:
-    if not isinstance(piece, dict):
-        return None
-    piece_type = piece.get('type')
-
-    if piece_type in {'output_json', 'json'}:
-        json_payload = piece.get('output_json') or piece.get('json') or piece.get('data')
-        json_text = _stringify_json(json_payload)
-        if json_text:
-            return json_text
+    # Depth-first walk over content -> piece -> content nesting with an explicit
+    # stack; the first non-empty text in document order wins. Payloads come
+    # straight from orjson, so exact type checks are safe.
+    stack: list[tuple[Any, bool]] = [(content, False)]
+    while stack:
+        node, is_piece = stack.pop()
+        if not is_piece:
+            node_type = type(node)
+            if node_type is str:
+                if node:
+                    return node
+            elif node_type is list:
+                stack.extend((piece, True) for piece in reversed(node))
+            elif node_type is dict:
+                stack.append((node, True))
+            continue
+
+        if type(node) is not dict:
+            continue
+        piece_type = node.get('type')
+        if piece_type in {'output_json', 'json'}:
+            json_text = _stringify_json(node.get('output_json') or node.get('json') or node.get('data'))
+            if json_text:
+                return json_text
 
-    if piece_type == 'output_text':
-        text = piece.get('text')
-        text_value = _normalize_text_value(text)
+        text_value = _normalize_text_value(node.get('text'))
         if text_value:
             return text_value
 
-    text_value = _normalize_text_value(piece.get('text'))
-    if text_value:
-        return text_value
+        if 'content' in node:
+            stack.append((node.get('content'), False))
+            continue
 
-    if 'content' in piece:
-        return _extract_from_content(piece.get('content'))
-
-    json_payload = piece.get('output_json') or piece.get('json')
-    json_text = _stringify_json(json_payload)
-    if json_text:
-        return json_text
+        json_text = _stringify_json(node.get('output_json') or node.get('json'))
+        if json_text:
+            return json_text
 
     return None
 
@@ -712,11 +1149,9 @@ def _normalize_text_value(value: Any) -> str | None:
 
 def _stringify_json(value: Any) -> str | None:
     if isinstance(value, (dict, list)):
-        import json
-
         try:
-            return json.dumps(value)
-        except TypeError:
+            return orjson.dumps(value).decode()
+        except orjson.JSONEncodeError:
             return None
     return None
 
@@ -732,43 +1167,40 @@ def _stringify_part(part: Any) -> str:
 
 
 def split_quick_output(text: str) -> tuple[str, str]:
+    # Strict json_schema output guarantees both keys, so that is the direct path.
+    # OpenAI-compatible providers configured via ModelConfig may ignore the
+    # schema, which is what the lenient fallback is for.
     try:
-        import json
+        value = orjson.loads(text)
+        return value['literal'], value['context']
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        return _split_quick_output_lenient(text)
 
-        value = json.loads(text)
+
+def _split_quick_output_lenient(text: str) -> tuple[str, str]:
+    try:
+        value = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        value = None
+    if isinstance(value, dict):
         return value.get('literal', ''), value.get('context', '')
-    except Exception:
-        lines = text.split('\n')
-        return lines[0] if lines else '', '\n'.join(lines[1:]).strip()
+    lines = text.split('\n')
+    return lines[0] if lines else '', '\n'.join(lines[1:]).strip()
 
 
 def parse_deep_response(text: str) -> dict[str, Any]:
+    # Schema-constrained output parses as-is; only fenced or prose-wrapped
+    # answers need the cleanup pass.
     try:
-        import json
-
-        payload = _prepare_json_payload(text)
-        data = json.loads(payload)
-        background = _format_background(data.get('background'))
-        cross_entries = []
-        for entry in _iterate_cross_culture(data.get('crossCulture')):
-            formatted = _format_cross_culture_entry(entry)
-            if formatted:
-                cross_entries.append(formatted)
-        lang_tag = _string_or_none(data.get('lang') or data.get('language'))
-        confidence_level = _normalize_confidence(data.get('confidence'))
-        confidence_meta = {
-            'level': confidence_level,
-            'notes': _string_or_none(data.get('confidenceNotes') or data.get('confidenceNote'))
-        }
-        reasoning = _string_or_none(data.get('reasoningNotes') or data.get('reasoning'))
-        return {
-            'lang': lang_tag,
-            'background': background,
-            'crossCulture': cross_entries,
-            'confidence': confidence_meta,
-            'reasoningNotes': reasoning
-        }
-    except Exception:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        data = None
+    if not isinstance(data, dict):
+        try:
+            data = orjson.loads(_prepare_json_payload(text))
+        except orjson.JSONDecodeError:
+            data = None
+    if not isinstance(data, dict):
         return {
             'lang': None,
             'background': _format_background(text),
@@ -776,10 +1208,55 @@ def parse_deep_response(text: str) -> dict[str, Any]:
             'confidence': {'level': 'medium', 'notes': None},
             'reasoningNotes': None
         }
+    background = _format_background(data.get('background'))
+    cross_entries = [
+        formatted
+        for entry in _iterate_cross_culture(data.get('crossCulture'))
+        if (formatted := _format_cross_culture_entry(entry))
+    ]
+    lang_tag = _string_or_none(_first(data, 'lang', 'language'))
+    confidence_level = _normalize_confidence(data.get('confidence'))
+    confidence_meta = {
+        'level': confidence_level,
+        'notes': _string_or_none(_first(data, 'confidenceNotes', 'confidenceNote'))
+    }
+    reasoning = _string_or_none(_first(data, 'reasoningNotes', 'reasoning'))
+    return {
+        'lang': lang_tag,
+        'background': background,
+        'crossCulture': cross_entries,
+        'confidence': confidence_meta,
+        'reasoningNotes': reasoning
+    }
+
+
+_SENTENCE_BREAK_RE = re.compile(r'(?<=[.!?])\s+')
+_HIGHLIGHT_BREAK_RE = re.compile(r'[\n;•\u2022]+')
+# "lang" leads the deep output schema, so it shows up within the first few deltas.
+_LANG_FIELD_RE = re.compile(r'"lang"\s*:\s*"([^"]*)"')
+_CODE_FENCE_RE = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.IGNORECASE | re.DOTALL)
 
 
 def _split_sentences(value: str) -> list[str]:
-    return [s.strip() for s in re.split(r'(?<=[.!?])\s+', value) if s.strip()]
+    return [sentence for part in _SENTENCE_BREAK_RE.split(value) if (sentence := part.strip())]
+
+
+_NO_DEFAULT: Any = object()
+
+
+def _first(data: dict, *keys: str, default: Any = _NO_DEFAULT) -> Any:
+    """Equivalent to ``data.get(k1) or data.get(k2) or ... [or default]``.
+
+    As with the ``or`` chain, the last operand comes back when nothing is truthy:
+    ``default`` when given, otherwise the (falsy) value stored under the last key.
+    """
+    get = data.get
+    value = None
+    for key in keys:
+        value = get(key)
+        if value:
+            return value
+    return value if default is _NO_DEFAULT else default
 
 
 def _string_or_none(value: Any) -> str | None:
@@ -807,7 +1284,7 @@ def _normalize_highlights(value: Any, fallback_detail: str | None) -> list[str]:
     if isinstance(value, list):
         highlights = [str(item).strip() for item in value if str(item).strip()]
     elif isinstance(value, str):
-        highlights = [segment.strip() for segment in re.split(r'[\n;•\u2022]+', value) if segment.strip()]
+        highlights = [segment.strip() for segment in _HIGHLIGHT_BREAK_RE.split(value) if segment.strip()]
     if not highlights and fallback_detail:
         highlights = _split_sentences(fallback_detail)
     return highlights[:4]
@@ -818,19 +1295,9 @@ def _format_background(raw: Any) -> dict[str, Any]:
     if parsed is not None and parsed is not raw:
         return _format_background(parsed)
     if isinstance(raw, dict):
-        summary = _string_or_none(
-            raw.get('summary')
-            or raw.get('headline')
-            or raw.get('mainIdea')
-            or raw.get('overview')
-        )
-        detail = _string_or_none(raw.get('detail') or raw.get('context') or raw.get('elaboration'))
-        highlights = _normalize_highlights(
-            raw.get('highlights')
-            or raw.get('keyTakeaways')
-            or raw.get('bulletPoints'),
-            detail
-        )
+        summary = _string_or_none(_first(raw, 'summary', 'headline', 'mainIdea', 'overview'))
+        detail = _string_or_none(_first(raw, 'detail', 'context', 'elaboration'))
+        highlights = _normalize_highlights(_first(raw, 'highlights', 'keyTakeaways', 'bulletPoints'), detail)
     else:
         text = _string_or_none(raw) or ''
         if not text:
@@ -858,31 +1325,17 @@ def _format_cross_culture_entry(entry: Any) -> dict[str, Any] | None:
         entry = parsed
     if not isinstance(entry, dict):
         return None
-    profile_id = str(
-        entry.get('profileId')
-        or entry.get('id')
-        or entry.get('profile')
-        or entry.get('profileName')
-        or 'profile'
-    )
-    profile_name = _string_or_none(entry.get('profileName') or entry.get('profile')) or profile_id
+    profile_id = str(_first(entry, 'profileId', 'id', 'profile', 'profileName', default='profile'))
+    profile_name = _string_or_none(_first(entry, 'profileName', 'profile')) or profile_id
     analogy = _string_or_none(
-        entry.get('analogy')
-        or entry.get('explanation')
-        or entry.get('translation')
-        or entry.get('description')
+        _first(entry, 'analogy', 'explanation', 'translation', 'description')
     ) or ''
-    headline = _string_or_none(entry.get('headline') or entry.get('title') or entry.get('summary'))
+    headline = _string_or_none(_first(entry, 'headline', 'title', 'summary'))
     if not headline and analogy:
         sentences = _split_sentences(analogy)
         headline = sentences[0] if sentences else analogy
-    context = _string_or_none(entry.get('context') or entry.get('nuance'))
-    notes = _string_or_none(
-        entry.get('notes')
-        or entry.get('optionalNotes')
-        or entry.get('learningTip')
-        or entry.get('nextSteps')
-    )
+    context = _string_or_none(_first(entry, 'context', 'nuance'))
+    notes = _string_or_none(_first(entry, 'notes', 'optionalNotes', 'learningTip', 'nextSteps'))
     confidence = _normalize_confidence(entry.get('confidence'))
     return {
         'profileId': profile_id,
@@ -895,41 +1348,43 @@ def _format_cross_culture_entry(entry: Any) -> dict[str, Any] | None:
     }
 
 
-def _iterate_cross_culture(raw: Any) -> list[Any]:
+def _iterate_cross_culture(raw: Any) -> list[Any] | tuple[Any, ...]:
     parsed = _maybe_parse_json(raw)
     if parsed is not None:
         raw = parsed
     if isinstance(raw, list):
         return raw
     if raw is None:
-        return []
-    return [raw]
+        return ()
+    return (raw,)
 
 
 def _maybe_parse_json(raw: Any) -> Any:
     if isinstance(raw, str):
-        candidate = raw.strip()
-        if candidate.startswith('{') or candidate.startswith('['):
+        # Only copy the string when there is whitespace to strip; a plain
+        # sentence is rejected on its first character without allocating.
+        candidate = raw.strip() if raw[:1].isspace() or raw[-1:].isspace() else raw
+        if candidate[:1] in ('{', '['):
             try:
-                import json
-
-                return json.loads(candidate)
-            except Exception:
+                return orjson.loads(candidate)
+            except orjson.JSONDecodeError:
                 return raw
     return raw
 
 
 def _prepare_json_payload(raw: Any) -> str:
     if isinstance(raw, (dict, list)):
-        import json
-
-        return json.dumps(raw)
+        return orjson.dumps(raw).decode()
     if not isinstance(raw, str):
         return str(raw)
 
     candidate = raw.strip()
     if not candidate:
         return candidate
+    # Schema-constrained output is already a bare object; skip the fence and
+    # bracket trimming (which would also misfire on a fence inside a string value).
+    if candidate[0] == '{' and candidate[-1] == '}':
+        return candidate
 
     fenced = _extract_code_fence(candidate)
     if fenced:
@@ -954,7 +1409,7 @@ def _prepare_json_payload(raw: Any) -> str:
 
 
 def _extract_code_fence(text: str) -> str | None:
-    fence_match = re.search(r'```(?:json)?\s*(.*?)\s*```', text, re.IGNORECASE | re.DOTALL)
+    fence_match = _CODE_FENCE_RE.search(text)
     if fence_match:
         return fence_match.group(1).strip()
     return None
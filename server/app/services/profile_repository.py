@@ -1,93 +1,201 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
 
+import orjson
+from pydantic import TypeAdapter
+
+from ..core.serialization import dump_json
 from ..schemas.profile import ProfileTemplate
 
 DB_DIR = Path(__file__).resolve().parents[3] / 'data'
 DB_DIR.mkdir(parents=True, exist_ok=True)
 DB_PATH = DB_DIR / 'profiles.db'
 
+# All profile queries share one connection, so a single private worker keeps
+# them on the same thread instead of hopping around the default pool.
+_DB_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='profilerepo')
+
+T = TypeVar('T')
+
+
+async def _in_db_thread(func: Callable[..., T], *args: Any) -> T:
+    return await asyncio.get_running_loop().run_in_executor(_DB_EXECUTOR, func, *args)
+
+
+_PROFILE_LIST = TypeAdapter(List[ProfileTemplate])
+
+# Every query is issued by name from this table so the SQL text is identical
+# on each call and pysqlite's statement cache reuses the compiled statement.
+_STATEMENTS = {
+    'list': 'SELECT payload FROM profiles ORDER BY updated_at DESC',
+    'exists': 'SELECT 1 FROM profiles WHERE id = ?',
+    'count_others': 'SELECT COUNT(*) FROM profiles WHERE id != ?',
+    'upsert': '''
+        INSERT INTO profiles (id, payload, created_at, updated_at)
+        VALUES (:id, :payload, :created_at, :updated_at)
+        ON CONFLICT(id) DO UPDATE SET
+            payload = excluded.payload,
+            created_at = excluded.created_at,
+            updated_at = excluded.updated_at
+    ''',
+    'delete': 'DELETE FROM profiles WHERE id = ?',
+}
+
 
 class ProfileRepository:
     def __init__(self, db_path: Optional[Path] = None) -> None:
         self._path = Path(db_path or DB_PATH)
         self._path.parent.mkdir(parents=True, exist_ok=True)
+        # One long-lived connection keeps SQLite's page cache warm across calls;
+        # the lock serialises the worker threads that share it.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, cached_statements=256)
+        self._conn.row_factory = sqlite3.Row
+        # Profiles only change through this repository, so the validated listing
+        # is served from memory until the next write. Cached instances are shared
+        # and must be treated as read-only.
+        self._listing: List[ProfileTemplate] | None = None
         self._ensure_schema()
 
-    def _get_connection(self) -> sqlite3.Connection:
-        connection = sqlite3.connect(self._path)
-        connection.row_factory = sqlite3.Row
-        return connection
+    @contextmanager
+    def _get_connection(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _run(self, name: str, params: Iterable | dict = ()) -> sqlite3.Cursor:
+        return self._conn.execute(_STATEMENTS[name], params)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
 
     def _ensure_schema(self) -> None:
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA temp_store=MEMORY')
+        self._conn.execute('PRAGMA mmap_size=268435456')
         with self._get_connection() as connection:
             connection.execute(
                 '''
                 CREATE TABLE IF NOT EXISTS profiles (
                     id TEXT PRIMARY KEY,
-                    payload TEXT NOT NULL,
+                    payload BLOB NOT NULL,
                     created_at INTEGER NOT NULL,
                     updated_at INTEGER NOT NULL
                 )
                 '''
             )
+            connection.execute(
+                'CREATE INDEX IF NOT EXISTS idx_profiles_updated_at ON profiles(updated_at DESC)'
+            )
+            # Rows written before payloads became BLOBs hold JSON text, some of it
+            # with snake_case timestamps; rewrite them once so reads can hand the
+            # stored bytes straight to pydantic.
+            legacy_rows = connection.execute(
+                "SELECT id, payload FROM profiles WHERE typeof(payload) = 'text'"
+            ).fetchall()
+            connection.executemany(
+                'UPDATE profiles SET payload = ? WHERE id = ?',
+                [(self._migrate_payload(row['payload']), row['id']) for row in legacy_rows],
+            )
 
-    def _row_to_profile(self, row: sqlite3.Row) -> ProfileTemplate:
-        data = json.loads(row['payload'])
+    @staticmethod
+    def _migrate_payload(raw: str) -> bytes:
+        data = orjson.loads(raw)
         # 转换回驼峰式命名
         if 'created_at' in data:
             data['createdAt'] = data.pop('created_at')
         if 'updated_at' in data:
             data['updatedAt'] = data.pop('updated_at')
-        return ProfileTemplate.model_validate(data)
+        return orjson.dumps(data)
 
     def list_profiles(self) -> List[ProfileTemplate]:
-        with self._get_connection() as connection:
-            rows = connection.execute(
-                'SELECT payload FROM profiles ORDER BY updated_at DESC'
-            ).fetchall()
-        return [self._row_to_profile(row) for row in rows]
+        listing = self._listing
+        if listing is None:
+            with self._get_connection():
+                rows = self._run('list').fetchall()
+                listing = _PROFILE_LIST.validate_json(b'[' + b','.join(row['payload'] for row in rows) + b']')
+                self._listing = listing
+        return list(listing)
+
+    def profile_exists(self, profile_id: str) -> bool:
+        listing = self._listing
+        if listing is not None:
+            return any(profile.id == profile_id for profile in listing)
+        with self._get_connection():
+            row = self._run('exists', (profile_id,)).fetchone()
+        return row is not None
+
+    @staticmethod
+    def _upsert_params(profile: ProfileTemplate) -> dict:
+        return {
+            'id': profile.id,
+            'payload': dump_json(profile),
+            'created_at': profile.createdAt,
+            'updated_at': profile.updatedAt,
+        }
 
     def save_profile(self, profile: ProfileTemplate) -> ProfileTemplate:
-        profile_dict = profile.model_dump()
-        # 转换字段名
-        profile_dict['created_at'] = profile_dict.pop('createdAt')
-        profile_dict['updated_at'] = profile_dict.pop('updatedAt')
-        
-        payload = json.dumps(profile_dict)
+        params = self._upsert_params(profile)
+        with self._get_connection():
+            self._listing = None
+            self._run('upsert', params)
+        return profile
+
+    def save_profiles(self, profiles: List[ProfileTemplate]) -> List[ProfileTemplate]:
+        # One transaction and one prepared statement for the whole batch, for
+        # seeding and restores.
+        params = [self._upsert_params(profile) for profile in profiles]
         with self._get_connection() as connection:
-            connection.execute(
-                '''
-                INSERT INTO profiles (id, payload, created_at, updated_at)
-                VALUES (:id, :payload, :created_at, :updated_at)
-                ON CONFLICT(id) DO UPDATE SET
-                    payload = excluded.payload,
-                    created_at = excluded.created_at,
-                    updated_at = excluded.updated_at
-                ''',
-                {
-                    'id': profile.id,
-                    'payload': payload,
-                    'created_at': profile_dict['created_at'],
-                    'updated_at': profile_dict['updated_at'],
-                },
-            )
+            self._listing = None
+            connection.executemany(_STATEMENTS['upsert'], params)
+        return profiles
+
+    def upsert_with_limit(self, profile: ProfileTemplate, max_profiles: int) -> ProfileTemplate:
+        params = self._upsert_params(profile)
+        with self._get_connection() as connection:
+            # Take the write lock before counting so two concurrent inserts cannot
+            # both see room for one more profile.
+            connection.execute('BEGIN IMMEDIATE')
+            self._listing = None
+            (others,) = self._run('count_others', (profile.id,)).fetchone()
+            if others >= max_profiles:
+                raise ValueError(f'Maximum number of profiles reached ({max_profiles}).')
+            self._run('upsert', params)
         return profile
 
     def delete_profile(self, profile_id: str) -> None:
-        with self._get_connection() as connection:
-            connection.execute('DELETE FROM profiles WHERE id = ?', (profile_id,))
+        with self._get_connection():
+            self._listing = None
+            self._run('delete', (profile_id,))
 
+    # Cache hits are plain list reads, so the async variants only hop to the
+    # database thread when SQLite actually has to be queried.
     async def a_list_profiles(self) -> List[ProfileTemplate]:
-        return await asyncio.to_thread(self.list_profiles)
+        if self._listing is not None:
+            return list(self._listing)
+        return await _in_db_thread(self.list_profiles)
+
+    async def a_profile_exists(self, profile_id: str) -> bool:
+        if self._listing is not None:
+            return self.profile_exists(profile_id)
+        return await _in_db_thread(self.profile_exists, profile_id)
 
     async def a_save_profile(self, profile: ProfileTemplate) -> ProfileTemplate:
-        return await asyncio.to_thread(self.save_profile, profile)
+        return await _in_db_thread(self.save_profile, profile)
+
+    async def a_save_profiles(self, profiles: List[ProfileTemplate]) -> List[ProfileTemplate]:
+        return await _in_db_thread(self.save_profiles, profiles)
+
+    async def a_upsert_with_limit(self, profile: ProfileTemplate, max_profiles: int) -> ProfileTemplate:
+        return await _in_db_thread(self.upsert_with_limit, profile, max_profiles)
 
     async def a_delete_profile(self, profile_id: str) -> None:
-        await asyncio.to_thread(self.delete_profile, profile_id)
+        await _in_db_thread(self.delete_profile, profile_id)
@@ -21,14 +21,11 @@ class ProfileStore:
     async def list_profiles(self) -> List[ProfileTemplate]:
         return await self._repository.a_list_profiles()
 
-    async def upsert(self, profile: ProfileTemplate) -> ProfileTemplate:
-        profiles = await self.list_profiles()
-        existing_ids = {item.id for item in profiles}
-
-        if profile.id not in existing_ids and len(profiles) >= MAX_PROFILES:
-            raise ValueError(f'Maximum number of profiles reached ({MAX_PROFILES}).')
+    async def exists(self, profile_id: str) -> bool:
+        return await self._repository.a_profile_exists(profile_id)
 
-        return await self._repository.a_save_profile(profile)
+    async def upsert(self, profile: ProfileTemplate) -> ProfileTemplate:
+        return await self._repository.a_upsert_with_limit(profile, MAX_PROFILES)
 
     async def delete(self, profile_id: str) -> None:
         await self._repository.a_delete_profile(profile_id)
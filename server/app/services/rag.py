@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Sequence
 
 try:
@@ -8,10 +10,47 @@ try:
 except ImportError:  # pragma: no cover
     PersistentClient = None  # type: ignore
 
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:  # pragma: no cover
+    SentenceTransformer = None  # type: ignore
+
 from ..core.config import get_settings
 from ..schemas.explain import SourceReference
 
 
+# Same model scripts/build_index.py embeds the corpus with.
+EMBEDDING_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+
+# Retrievers are built per request, so the Chroma client and its collection
+# handles live at module level instead of reopening the store every time.
+_client = None
+_collections: dict[str, Any] = {}
+_client_lock = threading.Lock()
+
+
+def _get_collection(name: str):
+    collection = _collections.get(name)
+    if collection is not None:
+        return collection
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PersistentClient(path=get_settings().vector_store_path)
+        collection = _collections.get(name)
+        if collection is None:
+            collection = _collections[name] = _client.get_or_create_collection(name)
+    return collection
+
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    # Loaded once per process; retrievers are built per request and would
+    # otherwise leave Chroma to embed every query from scratch.
+    return SentenceTransformer(EMBEDDING_MODEL)
+
+
 @dataclass
 class RetrievedDocument:
     text: str
@@ -22,21 +61,22 @@ class RetrievedDocument:
 class RagRetriever:
     def __init__(self, collection_name: str = 'lingualens'):
         self.collection_name = collection_name
-        self._client = None
         self._collection = None
 
     def ensure_collection(self):
         if PersistentClient is None:
             raise RuntimeError('Chroma is not installed.')
-        if self._client is None:
-            self._client = PersistentClient(path=get_settings().vector_store_path)
         if self._collection is None:
-            self._collection = self._client.get_or_create_collection(self.collection_name)
+            self._collection = _get_collection(self.collection_name)
         return self._collection
 
     def retrieve(self, query: str, top_k: int = 5) -> Sequence[RetrievedDocument]:
         collection = self.ensure_collection()
-        results = collection.query(query_texts=[query], n_results=top_k)
+        if SentenceTransformer is None:
+            results = collection.query(query_texts=[query], n_results=top_k)
+        else:
+            embedding = _get_encoder().encode([query], convert_to_numpy=True)
+            results = collection.query(query_embeddings=embedding.tolist(), n_results=top_k)
         documents = []
         for doc_text, metadata, distance in zip(
             results['documents'][0],
@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-import json
-
 from ..core.cache import CacheClient, get_cache
 from ..schemas.settings import SettingsPayload, SettingsUpdatePayload
 
@@ -18,14 +16,13 @@ class SettingsStore:
         return cls(client)
 
     async def get_settings(self) -> SettingsPayload:
-        raw = await self._client.get_json(SETTINGS_KEY)
+        raw = await self._client.get_raw(SETTINGS_KEY)
         if not raw:
             return SettingsPayload()
-        data = json.loads(raw)
-        return SettingsPayload.model_validate(data)
+        return SettingsPayload.model_validate_json(raw)
 
     async def save_settings(self, payload: SettingsPayload) -> SettingsPayload:
-        await self._client.set_json(SETTINGS_KEY, json.dumps(payload.model_dump()), ttl=None)
+        await self._client.set_json(SETTINGS_KEY, payload, ttl=None)
         return payload
 
     async def update_settings(self, update: SettingsUpdatePayload) -> SettingsPayload:
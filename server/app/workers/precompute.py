@@ -1,25 +1,47 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 from typing import Iterable
 
+from ..dependencies import get_explain_cache
 from ..schemas.explain import ExplainRequest
-from ..services.cache import ExplainCache
 from ..services.openai_client import OpenAIClient
 
+logger = logging.getLogger(__name__)
+
 
 async def precompute_hot_lines(requests: Iterable[ExplainRequest]) -> None:
-    cache = await ExplainCache.create()
+    requests = list(requests)
+    cache = await get_explain_cache()
+    cached = await cache.get_deep_many([(request.subtitleText, request.profileId) for request in requests])
+    misses = [request for request, hit in zip(requests, cached) if not hit]
+    if not misses:
+        return
+    # The client is pooled and shared, so it is not closed here.
     client = await OpenAIClient.create()
-    try:
-        for request in requests:
-            if await cache.get_deep(request.subtitleText, request.profileId):
-                continue
-            response = await client.quick_explain(request)
-            await cache.set_quick(request.subtitleText, request.profileId, response.model_dump())
-    finally:
-        await client.close()
+    # quick_explain_batch bounds the fan-out with the client's semaphore.
+    results = await client.quick_explain_batch(misses)
+    written = []
+    writes = []
+    for request, result in zip(misses, results):
+        if isinstance(result, BaseException):
+            logger.warning('precompute failed for %r', request.subtitleText, exc_info=result)
+            continue
+        written.append(request)
+        writes.append(cache.set_quick(request.subtitleText, request.profileId, result))
+    outcomes = await asyncio.gather(*writes, return_exceptions=True)
+    for request, outcome in zip(written, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.warning('precompute cache write failed for %r', request.subtitleText, exc_info=outcome)
+
+
+# The event loop only keeps weak references to tasks; holding them here stops
+# a scheduled run from being garbage-collected part way through.
+_scheduled: set[asyncio.Task] = set()
 
 
 def schedule_precompute(requests: Iterable[ExplainRequest]) -> None:
-    asyncio.create_task(precompute_hot_lines(requests))
+    task = asyncio.create_task(precompute_hot_lines(requests))
+    _scheduled.add(task)
+    task.add_done_callback(_scheduled.discard)
@@ -11,37 +11,57 @@ from sentence_transformers import SentenceTransformer
 from app.core.config import get_settings
 
 
-def build_index(input_path: Path, collection_name: str) -> None:
+BATCH_SIZE = 256
+
+
+def load_encoder(device: str | None = None) -> SentenceTransformer:
+    model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2', device=device)
+    if model.device.type == 'cuda':
+        # Half precision roughly doubles GPU encode throughput; CPU fp16 matmuls
+        # are slower than fp32, so CPU runs stay at full precision.
+        model.half()
+    return model
+
+
+def build_index(
+    input_path: Path,
+    collection_name: str,
+    batch_size: int = BATCH_SIZE,
+    device: str | None = None
+) -> None:
     settings = get_settings()
     client = PersistentClient(path=settings.vector_store_path)
     collection = client.get_or_create_collection(collection_name)
-    model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+    model = load_encoder(device)
 
     with input_path.open('r', encoding='utf-8') as handle:
         records = json.load(handle)
 
-    documents = [item['text'] for item in records]
-    metadatas = [item.get('metadata', {}) for item in records]
-    ids = [item['id'] for item in records]
-    embeddings = model.encode(documents).tolist()
-
-    collection.add(
-        ids=ids,
-        documents=documents,
-        metadatas=metadatas,
-        embeddings=embeddings
-    )
+    # Encoding and inserting a slice at a time keeps only one batch of
+    # embeddings alive and stays under Chroma's per-call add limit.
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        documents = [item['text'] for item in batch]
+        embeddings = model.encode(documents, batch_size=64, convert_to_numpy=True)
+        collection.add(
+            ids=[item['id'] for item in batch],
+            documents=documents,
+            metadatas=[item.get('metadata', {}) for item in batch],
+            embeddings=embeddings.astype('float32').tolist()
+        )
 
-    print(f'Indexed {len(documents)} documents into {collection_name}.')
+    print(f'Indexed {len(records)} documents into {collection_name}.')
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description='Build LinguaLens RAG index from JSON.')
     parser.add_argument('input', type=Path, help='Path to JSON dataset.')
     parser.add_argument('--collection', default='lingualens', help='Collection name.')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Documents encoded per batch.')
+    parser.add_argument('--device', default=None, help='Torch device for encoding, e.g. cuda or cpu.')
     return parser.parse_args()
 
 
 if __name__ == '__main__':
     args = parse_args()
-    build_index(args.input, args.collection)
+    build_index(args.input, args.collection, args.batch_size, args.device)
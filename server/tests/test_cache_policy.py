@@ -3,21 +3,67 @@ from typing import Any
 
 import pytest
 
+from app import dependencies
+from app.core import cache as core_cache
+from app.core.cache import CacheClient
 from app.services.cache import ExplainCache
+from app.schemas.history import HistoryEntry
+from app.services import history
+from app.services.history import HISTORY_KEY, HISTORY_PAYLOAD_KEY, HistoryStore
+
+
+class FakePipeline:
+    def __init__(self, client: 'FakeCacheClient'):
+        self._client = client
+        self._commands: list[tuple[str, str, Any, int | None]] = []
+
+    async def __aenter__(self) -> 'FakePipeline':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._commands.clear()
+
+    def set(self, key: str, value: Any, ex: int | None = None) -> None:
+        self._commands.append(('set', key, value, ex))
+
+    def get(self, key: str) -> None:
+        self._commands.append(('get', key, None, None))
+
+    async def execute(self) -> list[Any]:
+        self._client.round_trips += 1
+        results: list[Any] = []
+        for command, key, value, ttl in self._commands:
+            if command == 'set':
+                self._client.raw[key] = (value, ttl)
+                results.append(True)
+            else:
+                raw = self._client.raw.get(key)
+                results.append(raw[0] if raw else None)
+        return results
 
 
 class FakeCacheClient:
     def __init__(self):
         self.store: dict[str, tuple[Any, int]] = {}
+        self.raw: dict[str, tuple[Any, int | None]] = {}
+        self.round_trips = 0
 
     async def set_json(self, key: str, value: Any, ttl: int | None):
-        self.store[key] = (json.loads(value), ttl)
+        self.store[key] = (value, ttl)
 
     async def get_json(self, key: str) -> Any:
         value = self.store.get(key)
         if value:
-            return json.dumps(value[0])
-        return None
+            return value[0]
+        raw = self.raw.get(key)
+        return json.loads(raw[0]) if raw else None
+
+    async def mget_json(self, keys: list[str]) -> list[Any]:
+        self.round_trips += 1
+        return [await self.get_json(key) for key in keys]
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
 
 
 @pytest.mark.asyncio
@@ -33,3 +79,242 @@ async def test_explain_cache_distinguishes_quick_and_deep():
 
     assert quick['literal'] == 'literal'
     assert deep['background'] == 'bg'
+
+
+@pytest.mark.asyncio
+async def test_set_deep_writes_payload_and_replay_in_one_round_trip():
+    client = FakeCacheClient()
+    cache = ExplainCache(client)  # type: ignore[arg-type]
+
+    await cache.set_deep('Break a leg', 'p1', {'background': 'bg'}, replay=b'event: complete\n\n')
+
+    assert client.round_trips == 1
+    assert len(client.raw) == 2
+    assert await cache.get_deep('Break a leg', 'p1') == {'background': 'bg'}
+
+
+@pytest.mark.asyncio
+async def test_get_deep_many_checks_all_lines_in_one_round_trip():
+    client = FakeCacheClient()
+    cache = ExplainCache(client)  # type: ignore[arg-type]
+    await cache.set_deep('Break a leg', 'p1', {'background': 'bg'})
+    client.round_trips = 0
+
+    hits = await cache.get_deep_many([('Break a leg', 'p1'), ('Break a leg', None), ('Cold feet', 'p1')])
+
+    assert hits == [{'background': 'bg'}, None, None]
+    assert client.round_trips == 1
+
+
+def test_cache_keys_use_fixed_size_digest_of_normalised_text():
+    cache = ExplainCache(FakeCacheClient())  # type: ignore[arg-type]
+    long_text = 'word ' * 500
+
+    key = cache._deep_key(long_text, None)
+
+    assert key.startswith('deep::default::')
+    assert len(key) == len('deep::default::') + 16
+    assert cache._deep_key('  Break A Leg ', 'p1') == cache._deep_key('break a leg', 'p1')
+
+
+def test_cache_keys_ignore_punctuation_and_spacing():
+    cache = ExplainCache(FakeCacheClient())  # type: ignore[arg-type]
+
+    assert cache._quick_key('Break a leg!', None) == cache._quick_key('break,  a leg', None)
+    assert cache._quick_key("We'll see", None) != cache._quick_key('Well see', None)
+
+
+def test_cache_keys_keep_punctuation_only_lines_apart():
+    cache = ExplainCache(FakeCacheClient())  # type: ignore[arg-type]
+
+    assert cache._quick_key('...', None) != cache._quick_key('?!', None)
+    assert cache._quick_key(' ... ', None) == cache._quick_key('...', None)
+
+
+@pytest.mark.asyncio
+async def test_get_deep_replay_prefers_prebuilt_sse_buffer():
+    client = FakeCacheClient()
+    cache = ExplainCache(client)  # type: ignore[arg-type]
+
+    await cache.set_deep('Break a leg', None, {'background': 'bg'})
+    replay, payload = await cache.get_deep_replay('Break a leg', None)
+    assert replay is None
+    assert payload == {'background': 'bg'}
+
+    await cache.set_deep('Break a leg', None, {'background': 'bg'}, replay=b'event: complete\n\n')
+    replay, payload = await cache.get_deep_replay('Break a leg', None)
+    assert replay == b'event: complete\n\n'
+    assert payload is None
+
+
+@pytest.mark.asyncio
+async def test_redis_backed_stores_share_one_client(monkeypatch):
+    monkeypatch.setattr(core_cache, 'cache_client', CacheClient(object()))  # type: ignore[arg-type]
+    for name in ('_explain_cache', '_history_store', '_settings_store'):
+        monkeypatch.setattr(dependencies, name, None)
+
+    explain_cache = await dependencies.get_explain_cache()
+    history_store = await dependencies.get_history_store()
+    settings_store = await dependencies.get_settings_store()
+
+    assert explain_cache is await dependencies.get_explain_cache()
+    assert explain_cache._client.raw is history_store._client.raw is settings_store._client.raw
+
+
+class FakeLegacyRedis:
+    def __init__(self, kind: str, value: Any):
+        self.kind = kind
+        self.value = value
+        self.commands: list[tuple] = []
+
+    async def type(self, key: str) -> str:
+        return self.kind
+
+    async def get(self, key: str) -> Any:
+        return self.value
+
+    def pipeline(self, transaction: bool = True) -> 'FakeLegacyRedis':
+        return self
+
+    async def __aenter__(self) -> 'FakeLegacyRedis':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    def delete(self, *keys: str) -> None:
+        self.commands.append(('delete', *keys))
+
+    def hset(self, key: str, mapping: dict[str, Any]) -> None:
+        self.commands.append(('hset', key, sorted(mapping)))
+
+    def zadd(self, key: str, mapping: dict[str, int]) -> None:
+        self.commands.append(('zadd', key, mapping))
+
+    async def execute(self) -> list[Any]:
+        return []
+
+
+@pytest.mark.asyncio
+async def test_history_migrates_legacy_string_to_sorted_set():
+    redis = FakeLegacyRedis('string', json.dumps([
+        {'id': 'b', 'query': 'second', 'createdAt': 2},
+        {'id': 'a', 'query': 'first', 'createdAt': 1},
+        {'id': 'b', 'query': 'stale', 'createdAt': 0}
+    ]))
+    store = HistoryStore(CacheClient(redis))  # type: ignore[arg-type]
+
+    await store.migrate_legacy()
+
+    assert redis.commands == [
+        ('delete', HISTORY_KEY),
+        ('hset', HISTORY_PAYLOAD_KEY, ['a', 'b']),
+        ('zadd', HISTORY_KEY, {'b': 2, 'a': 1}),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_migration_leaves_sorted_set_alone():
+    redis = FakeLegacyRedis('zset', None)
+
+    await HistoryStore(CacheClient(redis)).migrate_legacy()  # type: ignore[arg-type]
+
+    assert redis.commands == []
+
+
+class FakeHistoryRedis:
+    """Sorted set and payload hash, with the save script emulated in Python."""
+
+    def __init__(self):
+        self.scores: dict[str, float] = {}
+        self.payloads: dict[str, str] = {}
+        self.script_calls = 0
+        self._queued: list[tuple] = []
+
+    def _ranked(self) -> list[str]:
+        return sorted(self.scores, key=lambda entry_id: (self.scores[entry_id], entry_id))
+
+    def register_script(self, script: str):
+        async def run(keys: list[str], args: list[Any]) -> int:
+            assert keys == [HISTORY_KEY, HISTORY_PAYLOAD_KEY]
+            self.script_calls += 1
+            entry_id, payload, created_at, limit = args
+            # The real client decodes responses, so payloads come back as str.
+            self.payloads[entry_id] = payload.decode() if isinstance(payload, bytes) else payload
+            self.scores[entry_id] = created_at
+            evicted = self._ranked()[:-limit]
+            for evicted_id in evicted:
+                del self.scores[evicted_id]
+                self.payloads.pop(evicted_id, None)
+            return len(evicted)
+        return run
+
+    async def zrevrange(self, key: str, start: int, end: int) -> list[str]:
+        return self._ranked()[::-1][start:end + 1]
+
+    async def hmget(self, key: str, fields: list[str]) -> list[str | None]:
+        return [self.payloads.get(field) for field in fields]
+
+    def pipeline(self, transaction: bool = True) -> 'FakeHistoryRedis':
+        assert transaction
+        return self
+
+    async def __aenter__(self) -> 'FakeHistoryRedis':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._queued.clear()
+
+    def zrem(self, key: str, member: str) -> None:
+        self._queued.append((self.scores, member))
+
+    def hdel(self, key: str, field: str) -> None:
+        self._queued.append((self.payloads, field))
+
+    async def execute(self) -> list[Any]:
+        return [target.pop(member, None) is not None for target, member in self._queued]
+
+
+def _entry(entry_id: str, created_at: int) -> HistoryEntry:
+    return HistoryEntry.model_validate({'id': entry_id, 'query': entry_id, 'createdAt': created_at})
+
+
+@pytest.mark.asyncio
+async def test_history_save_entry_indexes_and_stores_payload_in_one_script_call():
+    redis = FakeHistoryRedis()
+    store = HistoryStore(CacheClient(redis))  # type: ignore[arg-type]
+
+    saved = await store.save_entry(_entry('a', 1))
+
+    assert saved.id == 'a'
+    assert redis.script_calls == 1
+    assert redis.scores == {'a': 1}
+    assert HistoryEntry.model_validate_json(redis.payloads['a']) == saved
+
+
+@pytest.mark.asyncio
+async def test_history_lists_newest_first_and_trims_past_the_limit(monkeypatch):
+    monkeypatch.setattr(history, 'HISTORY_LIMIT', 3)
+    redis = FakeHistoryRedis()
+    store = HistoryStore(CacheClient(redis))  # type: ignore[arg-type]
+
+    for created_at, entry_id in [(2, 'b'), (1, 'a'), (4, 'd'), (3, 'c'), (5, 'e')]:
+        await store.save_entry(_entry(entry_id, created_at))
+
+    assert [entry.id for entry in await store.list_history()] == ['e', 'd', 'c']
+    assert [entry.id for entry in await store.list_history(limit=2)] == ['e', 'd']
+    # Trimmed ids lose their payloads too, so the hash cannot grow unbounded.
+    assert sorted(redis.payloads) == ['c', 'd', 'e']
+
+
+@pytest.mark.asyncio
+async def test_history_delete_entry_removes_id_and_payload():
+    redis = FakeHistoryRedis()
+    store = HistoryStore(CacheClient(redis))  # type: ignore[arg-type]
+    await store.save_entry(_entry('a', 1))
+    await store.save_entry(_entry('b', 2))
+
+    await store.delete_entry('a')
+
+    assert [entry.id for entry in await store.list_history()] == ['b']
+    assert 'a' not in redis.payloads
@@ -1,5 +1,5 @@
 from app.schemas.explain import SourceReference
-from app.services.merge import merge_sources, rank_sources
+from app.services.merge import merge_and_rank, merge_sources, rank_sources
 
 
 def make_source(title: str, credibility: str = 'medium', url: str | None = None) -> SourceReference:
@@ -32,3 +32,24 @@ def test_rank_sources_prioritises_credibility():
 
     ranked = rank_sources(sources)
     assert [source.title for source in ranked] == ['High', 'Medium', 'Low']
+
+
+def test_merge_and_rank_deduplicates_and_keeps_top_k():
+    urban = make_source('Urban')
+    sources = [
+        make_source('Low', credibility='low'),
+        make_source('High', credibility='high'),
+        urban
+    ]
+
+    ranked = merge_and_rank(sources, [make_source('Urban', url=urban.url)], top_k=2)
+    assert [source.title for source in ranked] == ['High', 'Urban']
+
+
+def test_merge_and_rank_keeps_every_source_without_top_k():
+    sources = [make_source(f'Low {idx}', credibility='low') for idx in range(12)]
+    high = make_source('High', credibility='high')
+
+    ranked = merge_and_rank(sources, [high])
+    assert len(ranked) == 13
+    assert ranked[0] == high
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import sqlite3
+
 import pytest
 
 from app.schemas.model import ModelConfig
+from app.services.model_repository import ModelRepository
 from app.services.models import ModelStore
 
 
@@ -62,3 +65,54 @@ async def test_model_store_crud_and_defaults(tmp_path):
     await store.delete_model('model-b')
     models = await store.list_models()
     assert [model.id for model in models] == ['model-a']
+
+
+def test_model_repository_migrates_json_text_payloads(tmp_path):
+    db_path = tmp_path / 'models.db'
+    legacy = make_config('legacy', is_default=True)
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            '''
+            CREATE TABLE model_configs (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                is_default INTEGER NOT NULL DEFAULT 0,
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL
+            )
+            '''
+        )
+        connection.execute(
+            'INSERT INTO model_configs VALUES (?, ?, 1, ?, ?)',
+            (legacy.id, legacy.model_dump_json(), legacy.createdAt, legacy.updatedAt)
+        )
+
+    repository = ModelRepository(db_path=db_path)
+    try:
+        assert repository.get_default() == legacy
+        assert repository.list_models() == [legacy]
+    finally:
+        repository.close()
+
+    with sqlite3.connect(db_path) as connection:
+        (kind,) = connection.execute('SELECT typeof(payload) FROM model_configs').fetchone()
+    assert kind == 'blob'
+
+
+@pytest.mark.asyncio
+async def test_model_store_serves_reads_from_memory_until_written(tmp_path):
+    store = await ModelStore.create(db_path=tmp_path / 'models.db')
+    await store.save_model(make_config('model-a', is_default=True))
+
+    first = await store.get_default()
+    assert await store.get_default() is first
+    assert await store.get_model('model-a') == first
+
+    await store.save_model(make_config('model-b', is_default=True))
+    default = await store.get_default()
+    assert default is not None and default.id == 'model-b'
+    assert not (await store.get_model('model-a')).isDefault
+
+    await store.delete_model('model-b')
+    assert await store.get_default() is None
+    assert [model.id for model in await store.list_models()] == ['model-a']
@@ -0,0 +1,427 @@
+import asyncio
+import json
+
+import httpx
+import orjson
+import pytest
+
+from app.schemas.explain import ExplainRequest, LanguagePair, QuickExplainResponse, SourceReference
+from app.schemas.model import ModelConfig
+from app.schemas.profile import ProfileTemplate
+from app.services.openai_client import (
+    DeepExplainJob,
+    OpenAIClient,
+    _deep_preamble,
+    _normalize_text_value,
+    _quick_preamble,
+    close_clients,
+    parse_deep_response
+)
+
+
+def make_request(subtitle: str, request_id: str = 'req-1') -> ExplainRequest:
+    return ExplainRequest(
+        requestId=request_id,
+        mode='deep',
+        subtitleText=subtitle,
+        timestamp=0,
+        languages={'primary': 'en'}
+    )
+
+
+def test_prompts_start_with_the_shared_language_preamble():
+    client = OpenAIClient.__new__(OpenAIClient)
+    sources = [SourceReference(title='Wiki', url='', credibility='high', excerpt='sample')]
+
+    quick = client._build_prompt(make_request('break a leg'))
+    deep = client._build_deep_prompt(make_request('no cap'), 'kb', sources)
+
+    assert quick.startswith(_quick_preamble('en'))
+    assert deep.startswith(_deep_preamble('en'))
+    assert quick.endswith('Subtitle: break a leg\nContext: n/a')
+    assert deep.endswith('Subtitle: no cap\nContext: n/a')
+
+
+@pytest.mark.asyncio
+async def test_quick_explain_shares_in_flight_calls_and_memoises_results():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    calls = []
+
+    async def fake_request(request: ExplainRequest) -> QuickExplainResponse:
+        calls.append(request.requestId)
+        await asyncio.sleep(0)
+        return QuickExplainResponse(
+            requestId=request.requestId,
+            literal='lit',
+            context='ctx',
+            languages=LanguagePair(primary='en'),
+            detectedAt=0,
+            expiresAt=0
+        )
+
+    client._request_quick = fake_request
+    try:
+        first, second = await asyncio.gather(
+            client.quick_explain(make_request('no cap', 'req-1')),
+            client.quick_explain(make_request('no cap', 'req-2'))
+        )
+        third = await client.quick_explain(make_request('no cap', 'req-3'))
+    finally:
+        await client.aclose()
+
+    assert calls == ['req-1']
+    assert [first.requestId, second.requestId, third.requestId] == ['req-1', 'req-2', 'req-3']
+    assert third.literal == 'lit'
+
+
+@pytest.mark.asyncio
+async def test_quick_explain_batch_bounds_concurrency_and_returns_failures_in_place(monkeypatch):
+    monkeypatch.setattr('app.services.openai_client.QUICK_BATCH_CONCURRENCY', 2)
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    active = peak = 0
+
+    async def fake_request(request: ExplainRequest) -> QuickExplainResponse:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        if request.subtitleText == 'boom':
+            raise RuntimeError('upstream failed')
+        return QuickExplainResponse(
+            requestId=request.requestId,
+            literal=request.subtitleText,
+            context='ctx',
+            languages=LanguagePair(primary='en'),
+            detectedAt=0,
+            expiresAt=0
+        )
+
+    client._request_quick = fake_request
+    try:
+        results = await client.quick_explain_batch(
+            [make_request(text, f'req-{idx}') for idx, text in enumerate(['a', 'boom', 'c', 'd'])]
+        )
+    finally:
+        await client.aclose()
+
+    assert peak == 2
+    assert isinstance(results[1], RuntimeError)
+    assert [result.literal for result in results if not isinstance(result, Exception)] == ['a', 'c', 'd']
+
+
+@pytest.mark.asyncio
+async def test_deep_explain_many_runs_jobs_concurrently():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    started = []
+    release = asyncio.Event()
+
+    async def fake_deep(request, knowledge_base, sources):
+        started.append(request.requestId)
+        await release.wait()
+        if request.subtitleText == 'boom':
+            raise RuntimeError('upstream failed')
+        return request.requestId
+
+    client.deep_explain = fake_deep
+    jobs = [DeepExplainJob(make_request(text, f'req-{idx}'), 'kb', []) for idx, text in enumerate(['a', 'boom'])]
+    try:
+        pending = asyncio.ensure_future(client.deep_explain_many(jobs))
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert started == ['req-0', 'req-1']
+        release.set()
+        results = await pending
+    finally:
+        await client.aclose()
+
+    assert results[0] == 'req-0'
+    assert isinstance(results[1], RuntimeError)
+
+
+
+@pytest.mark.asyncio
+async def test_quick_memo_misses_after_profile_edit_or_model_switch():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    calls = []
+
+    async def fake_request(request: ExplainRequest) -> QuickExplainResponse:
+        calls.append(request.requestId)
+        return QuickExplainResponse(
+            requestId=request.requestId,
+            literal='lit',
+            context='ctx',
+            languages=LanguagePair(primary='en'),
+            detectedAt=0,
+            expiresAt=0
+        )
+
+    profile = {
+        'id': 'p-1', 'name': 'Ana', 'description': 'desc', 'primaryLanguage': 'en',
+        'cultures': ['US'], 'createdAt': 1, 'updatedAt': 1
+    }
+    request = make_request('no cap', 'req-1').model_copy(update={'profile': ProfileTemplate(**profile)})
+    edited = make_request('no cap', 'req-2').model_copy(
+        update={'profile': ProfileTemplate(**{**profile, 'updatedAt': 2})}
+    )
+
+    client._request_quick = fake_request
+    try:
+        await client.quick_explain(request)
+        await client.quick_explain(edited)
+        await client.quick_explain(edited.model_copy(update={'requestId': 'req-3'}))
+        client.model_config = ModelConfig.model_construct(model='custom-model', temperature=None, maxTokens=0, topP=None)
+        await client.quick_explain(edited.model_copy(update={'requestId': 'req-4'}))
+    finally:
+        await client.aclose()
+
+    assert calls == ['req-1', 'req-2', 'req-4']
+
+@pytest.mark.asyncio
+async def test_deep_explain_batch_round_trip():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    uploaded = {}
+    body = {
+        'output_text': '{"lang": "en", "background": {"summary": "Means no lie."}, "crossCulture": []}'
+    }
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith('/files'):
+            uploaded['body'] = request.content
+            return httpx.Response(200, json={'id': 'file-in'})
+        if path.endswith('/batches'):
+            assert orjson.loads(request.content)['input_file_id'] == 'file-in'
+            return httpx.Response(200, json={'id': 'batch-1'})
+        if path.endswith('/batches/batch-1'):
+            return httpx.Response(200, json={'status': 'completed', 'output_file_id': 'file-out'})
+        if path.endswith('/files/file-out/content'):
+            line = {'custom_id': 'req-1', 'response': {'status_code': 200, 'body': body}}
+            return httpx.Response(200, content=orjson.dumps(line) + b'\n')
+        return httpx.Response(404)
+
+    await client.aclose()
+    client._client = httpx.AsyncClient(base_url='https://example.invalid/v1', transport=httpx.MockTransport(handler))
+    jobs = [
+        DeepExplainJob(make_request('no cap', 'req-1'), 'kb', []),
+        DeepExplainJob(make_request('yeet', 'req-2'), 'kb', [])
+    ]
+    try:
+        batch_id = await client.deep_explain_batch_submit(jobs)
+        results = await client.deep_explain_batch_fetch(batch_id, jobs)
+    finally:
+        await client.aclose()
+
+    assert batch_id == 'batch-1'
+    assert b'"custom_id":"req-2"' in uploaded['body']
+    assert results[0].background.summary == 'Means no lie.'
+    assert isinstance(results[1], RuntimeError)
+
+
+def test_profile_block_is_rendered_again_after_an_edit():
+    client = OpenAIClient.__new__(OpenAIClient)
+    profile = {
+        'id': 'p-1', 'name': 'Ana', 'description': 'desc', 'primaryLanguage': 'en',
+        'cultures': ['US'], 'createdAt': 1, 'updatedAt': 1
+    }
+    request = make_request('no cap').model_copy(update={'profile': ProfileTemplate(**profile)})
+    edited = request.model_copy(update={'profile': ProfileTemplate(**{**profile, 'tone': 'Playful', 'updatedAt': 2})})
+
+    assert 'Tone preference: Playful' not in client._build_prompt(request)
+    assert 'Tone preference: Playful' in client._build_prompt(edited)
+
+
+def test_profile_block_is_not_shared_between_profiles_with_the_same_id():
+    client = OpenAIClient.__new__(OpenAIClient)
+    profile = {
+        'id': 'default', 'name': 'Ana', 'description': 'desc', 'primaryLanguage': 'en',
+        'cultures': ['US'], 'createdAt': 1, 'updatedAt': 1
+    }
+    request = make_request('no cap').model_copy(update={'profile': ProfileTemplate(**profile)})
+    other_user = request.model_copy(update={'profile': ProfileTemplate(**{**profile, 'name': 'Ben'})})
+
+    assert 'Ana' in client._build_prompt(request)
+    assert 'Ben' in client._build_prompt(other_user)
+    assert 'Ana' in client._build_deep_prompt(request, '', [])
+    assert 'Ben' in client._build_deep_prompt(other_user, '', [])
+
+
+@pytest.mark.asyncio
+async def test_create_reuses_one_pooled_client_until_shutdown(monkeypatch):
+    class EmptyStore:
+        async def get_default(self):
+            return None
+
+    async def get_store():
+        return EmptyStore()
+
+    monkeypatch.setattr('app.services.openai_client.get_model_store', get_store)
+
+    first = await OpenAIClient.create(api_key='sk-test', base_url='https://example.invalid/v1')
+    second = await OpenAIClient.create(api_key='sk-test', base_url='https://example.invalid/v1')
+
+    assert second is first
+    assert not first._client.is_closed
+
+    await close_clients()
+    assert first._client.is_closed
+
+
+@pytest.mark.asyncio
+async def test_create_eviction_closes_clients_once_their_calls_finish(monkeypatch):
+    class EmptyStore:
+        async def get_default(self):
+            return None
+
+    async def get_store():
+        return EmptyStore()
+
+    monkeypatch.setattr('app.services.openai_client.get_model_store', get_store)
+    monkeypatch.setattr('app.services.openai_client.MAX_CACHED_CLIENTS', 1)
+    release = asyncio.Event()
+
+    async def slow_request(request: ExplainRequest) -> QuickExplainResponse:
+        await release.wait()
+        return QuickExplainResponse(
+            requestId=request.requestId,
+            literal='lit',
+            context='ctx',
+            languages=LanguagePair(primary='en'),
+            detectedAt=0,
+            expiresAt=0
+        )
+
+    busy = await OpenAIClient.create(api_key='sk-busy', base_url='https://example.invalid/v1')
+    busy._request_quick = slow_request
+    pending = asyncio.create_task(busy.quick_explain(make_request('no cap')))
+    await asyncio.sleep(0)
+
+    idle = await OpenAIClient.create(api_key='sk-idle', base_url='https://example.invalid/v1')
+    await OpenAIClient.create(api_key='sk-new', base_url='https://example.invalid/v1')
+    await asyncio.sleep(0)
+
+    assert idle._client.is_closed
+    assert not busy._client.is_closed
+
+    release.set()
+    assert (await pending).literal == 'lit'
+    await asyncio.sleep(0)
+    assert busy._client.is_closed
+
+    await close_clients()
+
+
+@pytest.mark.asyncio
+async def test_deep_explain_batch_polls_with_backoff_until_complete(monkeypatch):
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    delays = []
+    polls = iter([None, None, ['done']])
+
+    async def fake_submit(jobs):
+        return 'batch-1'
+
+    async def fake_fetch(batch_id, jobs):
+        return next(polls)
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    client.deep_explain_batch_submit = fake_submit
+    client.deep_explain_batch_fetch = fake_fetch
+    monkeypatch.setattr('app.services.openai_client.asyncio.sleep', fake_sleep)
+    try:
+        results = await client.deep_explain_batch([DeepExplainJob(make_request('no cap'), 'kb', [])])
+    finally:
+        await client.aclose()
+
+    assert results == ['done']
+    assert delays == [30.0, 60.0]
+
+
+def test_normalize_text_value_walks_nested_text_shapes():
+    assert _normalize_text_value('plain') == 'plain'
+    assert _normalize_text_value({'text': {'value': 'nested'}}) == 'nested'
+    assert _normalize_text_value(['a', None, {'content': ['b', {'data': 'c'}]}]) == 'a\nb\nc'
+    assert _normalize_text_value([{'other': 1}]) == '{"other":1}'
+    assert _normalize_text_value({'value': ''}) == ''
+    assert _normalize_text_value({'text': None}) is None
+
+
+@pytest.mark.asyncio
+async def test_responses_calls_retry_transient_failures(monkeypatch):
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    statuses = iter([429, 503, 200])
+    delays = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        if status == 429:
+            return httpx.Response(429, headers={'retry-after': '2'})
+        if status == 503:
+            return httpx.Response(503)
+        return httpx.Response(200, json={'output_text': '{"literal": "lit", "context": "ctx"}'})
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr('app.services.openai_client.asyncio.sleep', fake_sleep)
+    await client.aclose()
+    client._client = httpx.AsyncClient(base_url='https://example.invalid/v1', transport=httpx.MockTransport(handler))
+    try:
+        response = await client.quick_explain(make_request('break a leg'))
+    finally:
+        await client.aclose()
+
+    assert response.literal == 'lit'
+    assert delays[0] == 2.0
+    assert 0 <= delays[1] <= 1.0
+
+
+def test_generation_params_follow_model_config_updates():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    default_quick = client._quick_params
+
+    client.model_config = ModelConfig.model_construct(model='custom-model', temperature=None, maxTokens=0, topP=0.9)
+
+    assert client._quick_params.model == 'custom-model'
+    assert client._quick_params.temperature == default_quick.temperature
+    assert client._quick_params.max_tokens == default_quick.max_tokens
+    assert client._deep_params.top_p == 0.9
+
+
+@pytest.mark.asyncio
+async def test_deep_stream_stops_on_wrong_output_language():
+    client = OpenAIClient('https://example.invalid/v1', 'sk-test')
+    deltas = ['{"lang": ', '"ja", "back', 'ground": {"summary": "..."}}']
+    body = ''.join(
+        f'data: {orjson.dumps({"type": "response.output_text.delta", "delta": delta}).decode()}\n\n'
+        for delta in deltas
+    )
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, text=body, headers={'content-type': 'text/event-stream'})
+
+    await client.aclose()
+    client._client = httpx.AsyncClient(base_url='https://example.invalid/v1', transport=httpx.MockTransport(handler))
+    received = []
+    try:
+        with pytest.raises(RuntimeError, match='language mismatch'):
+            async for chunk in client.deep_explain_stream(make_request('no cap'), 'kb', []):
+                received.append(chunk.delta)
+    finally:
+        await client.aclose()
+
+    assert received == ['{"lang": ']
+
+
+def test_parse_deep_response_keeps_falsy_fallbacks_like_an_or_chain():
+    parsed = parse_deep_response(json.dumps({
+        'background': {'summary': 'Idiom.'},
+        'reasoning': [],
+        'crossCulture': [{'profileId': 'p1', 'profile': 0, 'summary': {}}]
+    }))
+
+    assert parsed['reasoningNotes'] == '[]'
+    [entry] = parsed['crossCulture']
+    assert entry['profileName'] == '0'
+    assert entry['headline'] == '{}'
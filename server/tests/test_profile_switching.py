@@ -1,3 +1,6 @@
+import asyncio
+import json
+import sqlite3
 import pytest
 from pathlib import Path
 
@@ -51,6 +54,8 @@ async def test_profile_store_upsert_and_delete(tmp_path: Path):
 
     profiles = await store.list_profiles()
     assert {profile.id for profile in profiles} == {'a', 'b'}
+    assert await store.exists('a')
+    assert not await store.exists('missing')
 
     await store.delete('a')
     profiles = await store.list_profiles()
@@ -63,25 +68,26 @@ async def test_profile_store_limits_to_three_profiles(tmp_path: Path):
     repository = ProfileRepository(db_path=db_path)
     store = ProfileStore(repository)
 
-    for idx in range(3):
-        await store.upsert(
-            ProfileTemplate(
-                id=f'id-{idx}',
-                name=f'P{idx}',
-                description='demo',
-                primaryLanguage='en',
-                cultures=['US'],
-                demographics={
-                    'ageRange': '18-25',
-                    'region': 'US',
-                    'occupation': 'Student'
-                },
-                personalPreference='Explain with clear classroom examples.',
-                tone='Neutral tone.',
-                createdAt=idx,
-                updatedAt=idx
-            )
+    await repository.a_save_profiles([
+        ProfileTemplate(
+            id=f'id-{idx}',
+            name=f'P{idx}',
+            description='demo',
+            primaryLanguage='en',
+            cultures=['US'],
+            demographics={
+                'ageRange': '18-25',
+                'region': 'US',
+                'occupation': 'Student'
+            },
+            personalPreference='Explain with clear classroom examples.',
+            tone='Neutral tone.',
+            createdAt=idx,
+            updatedAt=idx
         )
+        for idx in range(3)
+    ])
+    assert [profile.id for profile in await store.list_profiles()] == ['id-2', 'id-1', 'id-0']
 
     with pytest.raises(ValueError):
         await store.upsert(
@@ -102,3 +108,107 @@ async def test_profile_store_limits_to_three_profiles(tmp_path: Path):
                 updatedAt=4
             )
         )
+
+
+@pytest.mark.asyncio
+async def test_profile_store_limit_holds_under_concurrent_upserts(tmp_path: Path):
+    store = ProfileStore(ProfileRepository(db_path=tmp_path / 'profiles.db'))
+
+    def make(idx: int) -> ProfileTemplate:
+        return ProfileTemplate(
+            id=f'race-{idx}',
+            name=f'R{idx}',
+            description='race',
+            primaryLanguage='en',
+            cultures=['US'],
+            demographics={
+                'ageRange': '18-25',
+                'region': 'US',
+                'occupation': 'Student'
+            },
+            personalPreference='Explain with clear classroom examples.',
+            tone='Neutral tone.',
+            createdAt=idx,
+            updatedAt=idx
+        )
+
+    results = await asyncio.gather(*(store.upsert(make(idx)) for idx in range(6)), return_exceptions=True)
+
+    assert sum(isinstance(result, ValueError) for result in results) == 3
+    assert len(await store.list_profiles()) == 3
+    # Updating an existing profile never counts against the limit.
+    await store.upsert(make(next(idx for idx, result in enumerate(results) if not isinstance(result, ValueError))))
+
+
+@pytest.mark.asyncio
+async def test_profile_store_serves_listing_from_memory_until_written(tmp_path: Path):
+    store = ProfileStore(ProfileRepository(db_path=tmp_path / 'profiles.db'))
+
+    def make(profile_id: str, updated_at: int) -> ProfileTemplate:
+        return ProfileTemplate(
+            id=profile_id,
+            name=profile_id.upper(),
+            description='cached',
+            primaryLanguage='en',
+            cultures=['US'],
+            demographics={
+                'ageRange': '18-25',
+                'region': 'US',
+                'occupation': 'Student'
+            },
+            personalPreference='Explain with clear classroom examples.',
+            tone='Neutral tone.',
+            createdAt=1,
+            updatedAt=updated_at
+        )
+
+    await store.upsert(make('a', 1))
+    first = await store.list_profiles()
+    assert (await store.list_profiles())[0] is first[0]
+
+    await store.upsert(make('b', 2))
+    assert [profile.id for profile in await store.list_profiles()] == ['b', 'a']
+    assert await store.exists('b')
+
+    await store.delete('b')
+    assert not await store.exists('b')
+    assert [profile.id for profile in await store.list_profiles()] == ['a']
+
+
+def test_profile_repository_migrates_snake_case_text_payloads(tmp_path: Path):
+    db_path = tmp_path / 'profiles.db'
+    legacy = {
+        'id': 'legacy',
+        'name': 'Legacy',
+        'description': 'old row',
+        'primaryLanguage': 'en',
+        'cultures': ['US'],
+        'created_at': 5,
+        'updated_at': 7
+    }
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            '''
+            CREATE TABLE profiles (
+                id TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                created_at INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL
+            )
+            '''
+        )
+        connection.execute(
+            'INSERT INTO profiles VALUES (?, ?, ?, ?)',
+            ('legacy', json.dumps(legacy), 5, 7)
+        )
+
+    repository = ProfileRepository(db_path=db_path)
+    try:
+        [profile] = repository.list_profiles()
+        assert (profile.id, profile.createdAt, profile.updatedAt) == ('legacy', 5, 7)
+    finally:
+        repository.close()
+
+    with sqlite3.connect(db_path) as connection:
+        (kind,) = connection.execute('SELECT typeof(payload) FROM profiles').fetchone()
+    assert kind == 'blob'